@@ -31,20 +31,23 @@ class Database:
         """Initialize database manager.
         
         Args:
-            db_path: Path to SQLite database file
+            db_path: Path to SQLite database file, or a ``file:`` URI
+                (e.g. a shared-cache in-memory database for tests)
         """
         self.db_path = db_path
         self._connection: Optional[aiosqlite.Connection] = None
+        self._is_uri = db_path.startswith("file:")
         
-        # Ensure data directory exists (only if not in-memory)
-        if db_path != ":memory:":
+        # Ensure data directory exists (only if not in-memory or a URI)
+        if db_path != ":memory:" and not self._is_uri:
             Path(db_path).parent.mkdir(parents=True, exist_ok=True)
     
     async def connect(self):
         """Connect to database and initialize schema."""
         self._connection = await aiosqlite.connect(
             self.db_path,
-            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            uri=self._is_uri,
         )
         self._connection.row_factory = aiosqlite.Row
         
@@ -76,6 +76,8 @@ from src.models import (
     HttpRequestResponse,
     MemoryStoreRequest,
     MemoryStoreResponse,
+    MemoryBulkStoreRequest,
+    MemoryBulkStoreResponse,
     MemoryGetRequest,
     MemoryGetResponse,
     MemorySearchRequest,
@@ -546,10 +548,11 @@ def resolve_request_secrets(request):
     Raises:
         ValueError (wrapping SecretNotFoundError): If a key is not found
     """
-    if not secret_manager.has_templates(request.model_dump()):
+    params = request.model_dump()
+    if not secret_manager.has_templates(params):
         return request  # Nothing to resolve — return original
     try:
-        resolved_dict = secret_manager.resolve_params(request.model_dump())
+        resolved_dict = secret_manager.resolve_params(params)
         return type(request)(**resolved_dict)
     except SecretNotFoundError as exc:
         raise ValueError(str(exc)) from exc
@@ -2259,6 +2262,14 @@ Entity types:
 - event: Something that happened or will happen
 - note: Free-form note or observation"""
 
+_MEMORY_BULK_STORE_DESC = """Store several knowledge nodes in one request.
+
+Each item takes the same fields as memory_store. All relation targets are checked
+before anything is written, so the batch is stored completely or not at all.
+Relations may only point at nodes that already exist, not at other items in the batch.
+
+Required: items (list of memory_store requests)"""
+
 _MEMORY_GET_DESC = """Retrieve a memory node by its ID along with its relationships.
 
 Returns the full node content and metadata, plus connected edges and neighbor summaries.
@@ -2280,6 +2291,7 @@ _MEMORY_UPDATE_DESC = """Update a memory node's content or metadata.
 
 Only provided fields are changed. Metadata is merged (patch semantics — existing keys preserved).
 Tags replace the existing tag list entirely when provided.
+Returns the full updated node along with its previous content.
 
 Required: id
 Optional: content, name, tags, metadata"""
@@ -2375,6 +2387,38 @@ async def memory_store_sub(request: MemoryStoreRequest) -> MemoryStoreResponse:
     )
 
 
+@app.post(
+    "/api/tools/memory/bulk_store",
+    operation_id="memory_bulk_store",
+    summary="Store Knowledge Nodes in Bulk",
+    description=_MEMORY_BULK_STORE_DESC,
+    response_model=MemoryBulkStoreResponse,
+    tags=["memory"],
+)
+async def memory_bulk_store_root(request: MemoryBulkStoreRequest) -> MemoryBulkStoreResponse:
+    """Store several knowledge nodes (root app endpoint)."""
+    return await execute_tool(
+        "memory", "bulk_store", request.model_dump(),
+        lambda: memory_tools.bulk_store(request),
+    )
+
+
+@memory_app.post(
+    "/bulk_store",
+    operation_id="memory_bulk_store",
+    summary="Store Knowledge Nodes in Bulk",
+    description=_MEMORY_BULK_STORE_DESC,
+    response_model=MemoryBulkStoreResponse,
+    tags=["memory"],
+)
+async def memory_bulk_store_sub(request: MemoryBulkStoreRequest) -> MemoryBulkStoreResponse:
+    """Store several knowledge nodes (sub-app endpoint)."""
+    return await execute_tool(
+        "memory", "bulk_store", request.model_dump(),
+        lambda: memory_tools.bulk_store(request),
+    )
+
+
 @app.post(
     "/api/tools/memory/get",
     operation_id="memory_get",
@@ -2746,7 +2790,7 @@ Returns the execution order grouped by parallel level.
 The response includes `plan_id`; pass that value to `plan_execute`, `plan_status`, and `plan_cancel`.
 
 on_failure policies (plan-level default, overridable per-task):
-- **stop**: abort all remaining tasks when any task fails (default)
+- **stop**: once any task fails, no new task starts and the rest are skipped; tasks already running finish (default)
 - **skip_dependents**: skip only tasks that depend on the failed task
 - **continue**: continue all tasks regardless of failures"""
 
@@ -2755,7 +2799,8 @@ _PLAN_EXECUTE_DESC = """Execute a plan synchronously, blocking until all tasks c
 Input `plan_id` should be the `plan_id` returned by `plan_create`.
 For resilience, a unique plan name is also accepted; if multiple plans share that name, execution fails with an ambiguity error.
 
-Tasks at the same dependency level run **concurrently** via asyncio.gather.
+Each task starts **as soon as its dependencies finish**; ready tasks run concurrently.
+Under the `stop` policy no new task starts after a failure; tasks already running finish.
 Task outputs are stored and can be referenced in downstream params via `{{task:ID.field}}`.
 Tasks with `require_hitl: true` block for human approval before executing.
 
@@ -461,6 +461,17 @@ class MemoryStoreResponse(BaseModel):
     relations_created: int = Field(..., description="Number of edges created")
 
 
+class MemoryBulkStoreRequest(BaseModel):
+    """Request model for memory_bulk_store tool."""
+    items: list[MemoryStoreRequest] = Field(..., min_length=1, description="Nodes to store, in order")
+
+
+class MemoryBulkStoreResponse(BaseModel):
+    """Response model for memory_bulk_store tool."""
+    nodes: list[MemoryStoreResponse] = Field(..., description="Stored nodes, in request order")
+    total: int = Field(..., description="Number of nodes stored")
+
+
 class MemoryNode(BaseModel):
     """A memory knowledge node."""
     id: str = Field(..., description="Node ID")
@@ -532,7 +543,7 @@ class MemoryUpdateRequest(BaseModel):
 
 class MemoryUpdateResponse(BaseModel):
     """Response model for memory_update tool."""
-    node: dict = Field(..., description="Updated node summary {id, name, updated_at}")
+    node: dict = Field(..., description="The node as stored after the update (same fields as memory_get's node)")
     previous_content: str = Field(..., description="Content before the update (for audit/undo)")
 
 
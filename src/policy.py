@@ -1,7 +1,10 @@
 """Policy enforcement for tool executions."""
 
 import fnmatch
-from typing import Any, Dict, Literal, Optional
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 from src.config import Config, ToolPolicyConfig
 from src.logging_config import get_logger
@@ -11,6 +14,31 @@ logger = get_logger(__name__)
 PolicyDecision = Literal["allow", "block", "hitl"]
 
 
+@lru_cache(maxsize=256)
+def _compile_patterns(patterns: Tuple[str, ...]) -> re.Pattern:
+    """Combine glob patterns into one regex, compiled once per pattern set.
+
+    Keyed on the patterns themselves, so policy edits made at runtime simply
+    compile a new entry instead of serving a stale one.
+    """
+    return re.compile("|".join(fnmatch.translate(os.path.normcase(p)) for p in patterns))
+
+
+def _first_matching_pattern(path: str, patterns: List[str]) -> Optional[str]:
+    """Return the first glob pattern *path* matches, or None.
+
+    Same semantics as ``fnmatch.fnmatch`` per pattern, but a miss (the common
+    case) costs a single compiled regex match.
+    """
+    # An empty alternation would compile to "" and match every path
+    if not patterns:
+        return None
+    if not _compile_patterns(tuple(patterns)).match(os.path.normcase(path)):
+        return None
+    # Only on a hit: find which pattern matched, for logging
+    return next((p for p in patterns if fnmatch.fnmatch(path, p)), None)
+
+
 class PolicyEngine:
     """Policy engine for tool execution control."""
     
@@ -147,14 +175,14 @@ class PolicyEngine:
         # Check path parameter against patterns
         path = params.get("path", "")
         if path:
-            for pattern in policy.block_patterns:
-                if fnmatch.fnmatch(path, pattern):
-                    logger.debug(
-                        "block_pattern_matched",
-                        path=path,
-                        pattern=pattern,
-                    )
-                    return True
+            pattern = _first_matching_pattern(path, policy.block_patterns)
+            if pattern is not None:
+                logger.debug(
+                    "block_pattern_matched",
+                    path=path,
+                    pattern=pattern,
+                )
+                return True
         
         return False
     
@@ -178,14 +206,14 @@ class PolicyEngine:
         # Check path parameter against patterns
         path = params.get("path", "")
         if path:
-            for pattern in policy.hitl_patterns:
-                if fnmatch.fnmatch(path, pattern):
-                    logger.debug(
-                        "hitl_pattern_matched",
-                        path=path,
-                        pattern=pattern,
-                    )
-                    return True
+            pattern = _first_matching_pattern(path, policy.hitl_patterns)
+            if pattern is not None:
+                logger.debug(
+                    "hitl_pattern_matched",
+                    path=path,
+                    pattern=pattern,
+                )
+                return True
         
         return False
 
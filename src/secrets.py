@@ -6,17 +6,47 @@ Loads secrets from a .env-format file and provides:
 - Secret masking in audit logs and error messages
 """
 
-import copy
+import json
 import re
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 from src.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 # Regex to find {{secret:KEY}} templates
 _SECRET_TEMPLATE_RE = re.compile(r"\{\{secret:([A-Za-z0-9_]+)\}\}")
+# Literal prefix every template starts with, for cheap substring screening
+_SECRET_TEMPLATE_MARKER = "{{secret:"
+
+# One KEY=VALUE assignment per line.  Leading "#" marks a comment; the key is
+# everything before the first "=", and a value wrapped in matching quotes is
+# unquoted (groups 2/3), otherwise taken verbatim (group 4).  Surrounding
+# whitespace is trimmed without crossing line boundaries.
+_ENV_ASSIGN_RE = re.compile(
+    r"""^[^\S\n]*((?:[^#\s=][^=\n]*?)?)[^\S\n]*=[^\S\n]*"""
+    r"""(?:"(.*)"|'(.*)'|(.*?))[^\S\n]*$""",
+    re.MULTILINE,
+)
+# Non-blank, non-comment lines without "=" (reported, then skipped)
+_ENV_MALFORMED_RE = re.compile(r"^[^\S\n]*[^#\s=][^=\n]*$", re.MULTILINE)
+
+
+def _contains_marker(params: Dict[str, Any]) -> bool:
+    """Cheap pre-check: does the template marker appear anywhere in *params*?
+
+    json.dumps serializes the whole structure in C, which is far faster than
+    walking it in Python.  A hit may be a false positive (e.g. in a key), so
+    callers still confirm with the regex walk.
+    """
+    return _SECRET_TEMPLATE_MARKER in json.dumps(params, default=str)
 
 
 class SecretNotFoundError(ValueError):
@@ -35,7 +65,10 @@ class SecretManager:
         """
         self.secrets_file = Path(secrets_file)
         self._secrets: Dict[str, str] = {}
+        self._mask_automaton: Optional[Any] = None
+        self._mask_re: Optional[re.Pattern] = None
         self._load()
+        self._build_masker()
 
     # ------------------------------------------------------------------
     # Loading
@@ -47,34 +80,26 @@ class SecretManager:
             logger.warning("secrets_file_not_found", path=str(self.secrets_file))
             return
 
-        secrets: Dict[str, str] = {}
         try:
-            with open(self.secrets_file, "r") as f:
-                for lineno, raw_line in enumerate(f, 1):
-                    line = raw_line.strip()
-                    # Skip comments and empty lines
-                    if not line or line.startswith("#"):
-                        continue
-                    if "=" not in line:
-                        logger.warning(
-                            "secrets_malformed_line",
-                            path=str(self.secrets_file),
-                            line=lineno,
-                        )
-                        continue
-                    key, _, value = line.partition("=")
-                    key = key.strip()
-                    value = value.strip()
-                    # Strip optional surrounding quotes from value
-                    if len(value) >= 2 and value[0] in ('"', "'") and value[-1] == value[0]:
-                        value = value[1:-1]
-                    if key:
-                        secrets[key] = value
-
-            self._secrets = secrets
-            logger.info("secrets_loaded", count=len(secrets), path=str(self.secrets_file))
+            text = self.secrets_file.read_text()
         except OSError as exc:
             logger.error("secrets_load_error", path=str(self.secrets_file), error=str(exc))
+            return
+
+        for match in _ENV_MALFORMED_RE.finditer(text):
+            logger.warning(
+                "secrets_malformed_line",
+                path=str(self.secrets_file),
+                line=text.count("\n", 0, match.start()) + 1,
+            )
+
+        secrets: Dict[str, str] = {}
+        for key, double_quoted, single_quoted, bare in _ENV_ASSIGN_RE.findall(text):
+            if key:
+                secrets[key] = double_quoted or single_quoted or bare
+
+        self._secrets = secrets
+        logger.info("secrets_loaded", count=len(secrets), path=str(self.secrets_file))
 
     def reload(self) -> int:
         """Reload secrets from file.
@@ -84,8 +109,39 @@ class SecretManager:
         """
         self._secrets = {}
         self._load()
+        self._build_masker()
         return len(self._secrets)
 
+    def _build_masker(self) -> None:
+        """Precompute what mask_value() scans for from the loaded secrets.
+
+        All values go into one matcher so masking is a single pass over the
+        text regardless of secret count: an Aho-Corasick automaton when
+        pyahocorasick is installed, otherwise one compiled alternation regex.
+        Both report every position a secret starts at, and overlapping
+        matches are merged, so the two give identical output.
+        """
+        # Longest first so the regex reports the longest secret at each position
+        mask_values = sorted(
+            {v for v in self._secrets.values() if v}, key=len, reverse=True
+        )
+        self._mask_automaton = None
+        self._mask_re = None
+        if not mask_values:
+            return
+
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for secret_value in mask_values:
+                automaton.add_word(secret_value, len(secret_value))
+            automaton.make_automaton()
+            self._mask_automaton = automaton
+        else:
+            # Zero-width lookahead so matches that overlap are all reported
+            self._mask_re = re.compile(
+                "(?=(" + "|".join(re.escape(v) for v in mask_values) + "))"
+            )
+
     # ------------------------------------------------------------------
     # Introspection (no values exposed)
     # ------------------------------------------------------------------
@@ -128,19 +184,22 @@ class SecretManager:
     def resolve_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Recursively resolve {{secret:KEY}} templates in a parameter dict.
 
-        Creates a deep copy so the originals are preserved for audit logging.
+        The walk rebuilds every dict and list it visits, so the originals are
+        preserved for audit logging without a separate deep copy.
 
         Args:
             params: Tool parameter dictionary (may be nested)
 
         Returns:
-            New dict with all secret templates resolved
+            New dict with all secret templates resolved, or *params* itself
+            when it contains no templates at all
 
         Raises:
             SecretNotFoundError: If a referenced key does not exist
         """
-        resolved = copy.deepcopy(params)
-        return self._resolve_any(resolved)
+        if not _contains_marker(params):
+            return params
+        return self._resolve_any(params)
 
     def _resolve_any(self, value: Any) -> Any:
         """Recursively resolve templates in any value."""
@@ -165,26 +224,45 @@ class SecretManager:
         Returns:
             String with secret values replaced by [REDACTED]
         """
-        result = text
-        for secret_value in self._secrets.values():
-            if secret_value and secret_value in result:
-                result = result.replace(secret_value, "[REDACTED]")
-        return result
+        if self._mask_automaton is not None:
+            spans = sorted(
+                (end - length + 1, end + 1)
+                for end, length in self._mask_automaton.iter(text)
+            )
+        elif self._mask_re is not None:
+            spans = [match.span(1) for match in self._mask_re.finditer(text)]
+        else:
+            return text
+        if not spans:
+            return text
+
+        parts: List[str] = []
+        pos = 0
+        for start, end in spans:
+            if start < pos:
+                # Overlaps the previous match — extend that redaction instead
+                pos = max(pos, end)
+                continue
+            parts.append(text[pos:start])
+            parts.append("[REDACTED]")
+            pos = end
+        parts.append(text[pos:])
+        return "".join(parts)
 
     def mask_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Return a deep-copy of params with all secret values replaced by [REDACTED].
+        """Return a copy of params with all secret values replaced by [REDACTED].
 
         Also strips any already-resolved secret values that may have leaked
-        into nested dicts/lists.
+        into nested dicts/lists.  Dicts and lists are rebuilt during the walk,
+        so the original is never mutated.
 
         Args:
             params: Parameter dictionary
 
         Returns:
-            Deep-copied dict with secrets masked
+            New dict with secrets masked
         """
-        masked = copy.deepcopy(params)
-        return self._mask_any(masked)
+        return self._mask_any(params)
 
     def _mask_any(self, value: Any) -> Any:
         """Recursively mask secret values in any value."""
@@ -198,6 +276,8 @@ class SecretManager:
 
     def has_templates(self, params: Dict[str, Any]) -> bool:
         """Return True if any parameter value contains a {{secret:KEY}} template."""
+        if not _contains_marker(params):
+            return False
         return self._has_templates_any(params)
 
     def _has_templates_any(self, value: Any) -> bool:
@@ -11,7 +11,10 @@ from src.database import Database
 from src.logging_config import get_logger
 from src.models import (
     MemoryStoreRequest,
+    MemoryStoreRelation,
     MemoryStoreResponse,
+    MemoryBulkStoreRequest,
+    MemoryBulkStoreResponse,
     MemoryGetRequest,
     MemoryGetResponse,
     MemoryNode,
@@ -165,25 +168,73 @@ class MemoryTools:
         Raises:
             NodeNotFoundError: If any relation target_id does not exist
         """
-        node_id = _new_id()
+        conn = self.db.connection
+        await self._check_relation_targets(req.relations)
+        result = await self._insert_node(req, _now_iso())
+
+        await conn.commit()
+        logger.info("memory_store", node_id=result.id, entity_type=req.entity_type)
+        return result
+
+    # ------------------------------------------------------------------
+    # memory_bulk_store
+    # ------------------------------------------------------------------
+
+    async def bulk_store(self, req: MemoryBulkStoreRequest) -> MemoryBulkStoreResponse:
+        """Store several knowledge nodes with a single commit.
+
+        Every relation target is validated before anything is written, and a
+        failed insert rolls back the rows already written, so the batch is
+        stored either completely or not at all.
+
+        Args:
+            req: Bulk store request holding one store request per node
+
+        Returns:
+            MemoryBulkStoreResponse with the stored nodes in request order
+
+        Raises:
+            NodeNotFoundError: If any relation target_id does not exist
+        """
+        conn = self.db.connection
+        for item in req.items:
+            await self._check_relation_targets(item.relations)
+
         now = _now_iso()
+        try:
+            nodes = [await self._insert_node(item, now) for item in req.items]
+            await conn.commit()
+        except Exception:
+            # The connection is shared; don't leave partial rows for the next commit
+            await conn.rollback()
+            raise
+        logger.info("memory_bulk_store", count=len(nodes))
+        return MemoryBulkStoreResponse(nodes=nodes, total=len(nodes))
+
+    async def _check_relation_targets(
+        self, relations: Optional[List[MemoryStoreRelation]]
+    ) -> None:
+        """Raise NodeNotFoundError unless every relation target exists."""
+        if not relations:
+            return
+        conn = self.db.connection
+        for rel in relations:
+            row = await conn.execute(
+                "SELECT id FROM memory_nodes WHERE id = ?", (rel.target_id,)
+            )
+            if not await row.fetchone():
+                raise NodeNotFoundError(
+                    f"Relation target node '{rel.target_id}' does not exist"
+                )
+
+    async def _insert_node(self, req: MemoryStoreRequest, now: str) -> MemoryStoreResponse:
+        """Insert one node and its relation edges without committing."""
+        node_id = _new_id()
         name = req.name or req.content[:60]
         tags_json = json.dumps(req.tags or [])
         metadata_json = json.dumps(req.metadata or {})
 
         conn = self.db.connection
-
-        # Validate relation targets exist before inserting
-        if req.relations:
-            for rel in req.relations:
-                row = await conn.execute(
-                    "SELECT id FROM memory_nodes WHERE id = ?", (rel.target_id,)
-                )
-                if not await row.fetchone():
-                    raise NodeNotFoundError(
-                        f"Relation target node '{rel.target_id}' does not exist"
-                    )
-
         await conn.execute(
             """
             INSERT INTO memory_nodes (id, name, content, entity_type, tags, metadata, source, created_at, updated_at)
@@ -207,9 +258,6 @@ class MemoryTools:
                 )
                 relations_created += 1
 
-        await conn.commit()
-        logger.info("memory_store", node_id=node_id, entity_type=req.entity_type)
-
         return MemoryStoreResponse(
             id=node_id,
             name=name,
@@ -437,7 +485,7 @@ class MemoryTools:
             req: Update request specifying which fields to change
 
         Returns:
-            MemoryUpdateResponse with previous content and updated timestamp
+            MemoryUpdateResponse with the full updated node and previous content
 
         Raises:
             NodeNotFoundError: If the node does not exist
@@ -477,8 +525,19 @@ class MemoryTools:
         await conn.commit()
         logger.info("memory_update", node_id=req.id)
 
+        node = MemoryNode(
+            id=req.id,
+            name=new_name,
+            content=new_content,
+            entity_type=existing["entity_type"],
+            tags=_parse_json_field(new_tags, []),
+            metadata=_parse_json_field(new_metadata, {}),
+            source=existing["source"],
+            created_at=existing["created_at"],
+            updated_at=now,
+        )
         return MemoryUpdateResponse(
-            node={"id": req.id, "name": new_name, "updated_at": now},
+            node=node.model_dump(),
             previous_content=previous_content,
         )
 
@@ -5,7 +5,7 @@ import json
 import re
 import time
 import uuid
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime, timezone
 from typing import Any, Callable, Dict, List, Optional, Set
 
@@ -65,43 +65,38 @@ def _compute_execution_levels(tasks: List[Dict]) -> List[List[str]]:
     Raises:
         PlanValidationError: If cycle detected or a depends_on ID is unknown.
     """
-    task_ids: Set[str] = {t["id"] for t in tasks}
+    # in_degree[tid] = number of unsatisfied dependencies
+    in_degree: Dict[str, int] = {t["id"]: len(t.get("depends_on", [])) for t in tasks}
+    # succ[tid] = list of task IDs that depend on tid (reverse edges)
+    succ: Dict[str, List[str]] = defaultdict(list)
 
-    # Validate all depends_on references exist in this plan
+    # Validate depends_on references while building the reverse edges
     for task in tasks:
         for dep in task.get("depends_on", []):
-            if dep not in task_ids:
+            if dep not in in_degree:
                 raise PlanValidationError(
                     f"Task '{task['id']}' depends on unknown task '{dep}'"
                 )
+            succ[dep].append(task["id"])
 
-    # in_degree[tid] = number of unsatisfied dependencies
-    in_degree: Dict[str, int] = {t["id"]: 0 for t in tasks}
-    # adj[tid] = list of task IDs that depend on tid (reverse edges)
-    adj: Dict[str, List[str]] = {t["id"]: [] for t in tasks}
-
-    for task in tasks:
-        for dep in task.get("depends_on", []):
-            in_degree[task["id"]] += 1
-            adj[dep].append(task["id"])
-
-    # Start with tasks that have no dependencies
-    queue: List[str] = sorted(tid for tid in task_ids if in_degree[tid] == 0)
+    # Start with tasks that have no dependencies; each level is sorted so
+    # execution_order is deterministic
+    frontier: List[str] = sorted(tid for tid, deg in in_degree.items() if deg == 0)
     levels: List[List[str]] = []
-    visited = 0
-
-    while queue:
-        levels.append(list(queue))
-        next_queue: List[str] = []
-        for tid in queue:
-            visited += 1
-            for neighbor in adj[tid]:
-                in_degree[neighbor] -= 1
-                if in_degree[neighbor] == 0:
-                    next_queue.append(neighbor)
-        queue = sorted(next_queue)
-
-    if visited != len(tasks):
+    emitted = 0
+
+    while frontier:
+        levels.append(frontier)
+        emitted += len(frontier)
+        next_frontier: List[str] = []
+        for tid in frontier:
+            for child in succ.get(tid, ()):
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    next_frontier.append(child)
+        frontier = sorted(next_frontier)
+
+    if emitted != len(tasks):
         raise PlanValidationError(
             "Cycle detected in task dependency graph — plan cannot be executed"
         )
@@ -110,17 +105,22 @@ def _compute_execution_levels(tasks: List[Dict]) -> List[List[str]]:
 
 
 def _get_transitive_dependents(failed_id: str, all_tasks: List[Dict]) -> Set[str]:
-    """Return the set of task IDs that transitively depend on failed_id."""
-    depends_on_map: Dict[str, List[str]] = {
-        t["id"]: _parse_json_field(t.get("depends_on", "[]"), [])
-        for t in all_tasks
-    }
+    """Return the set of task IDs that transitively depend on failed_id.
+
+    Expects each task's ``depends_on`` already parsed into a list.
+    """
+    # Reverse edges: dependency -> dependents
+    children: Dict[str, List[str]] = defaultdict(list)
+    for t in all_tasks:
+        for dep in t.get("depends_on", ()):
+            children[dep].append(t["id"])
+
     dependents: Set[str] = set()
-    queue = [failed_id]
+    queue = deque([failed_id])
     while queue:
-        current = queue.pop()
-        for task_id, deps in depends_on_map.items():
-            if current in deps and task_id not in dependents:
+        current = queue.popleft()
+        for task_id in children.get(current, ()):
+            if task_id not in dependents:
                 dependents.add(task_id)
                 queue.append(task_id)
     return dependents
@@ -137,8 +137,19 @@ def _resolve_task_refs(params: Dict, task_outputs: Dict[str, Dict]) -> Dict:
     larger string, the resolved value is coerced to a string.
     """
 
+    def _inline(m: re.Match) -> str:
+        output = task_outputs.get(m.group(1), {})
+        val = output.get(m.group(2), "")
+        if isinstance(val, (dict, list)):
+            return json.dumps(val)
+        return str(val)
+
     def _resolve_value(v: Any) -> Any:
         if isinstance(v, str):
+            # Most params carry no references; skip the regex engine for them
+            if "{{task:" not in v:
+                return v
+
             full = _TASK_REF_FULL.match(v)
             if full:
                 # Entire string is a reference — preserve the original type
@@ -146,13 +157,6 @@ def _resolve_task_refs(params: Dict, task_outputs: Dict[str, Dict]) -> Dict:
                 return output.get(full.group(2), "")
 
             # Partial reference(s) — inline-substitute as strings
-            def _inline(m: re.Match) -> str:
-                output = task_outputs.get(m.group(1), {})
-                val = output.get(m.group(2), "")
-                if isinstance(val, (dict, list)):
-                    return json.dumps(val)
-                return str(val)
-
             return _TASK_REF_PATTERN.sub(_inline, v)
         elif isinstance(v, dict):
             return {k: _resolve_value(vv) for k, vv in v.items()}
@@ -166,7 +170,13 @@ def _resolve_task_refs(params: Dict, task_outputs: Dict[str, Dict]) -> Dict:
 class PlanTools:
     """DAG-based plan creation and execution tools."""
 
-    def __init__(self, db: Database, hitl_manager: Any, tool_dispatch: Callable):
+    def __init__(
+        self,
+        db: Database,
+        hitl_manager: Any,
+        tool_dispatch: Callable,
+        record_output: bool = True,
+    ):
         """Initialize plan tools.
 
         Args:
@@ -174,10 +184,15 @@ class PlanTools:
             hitl_manager: HITLManager for task-level HITL gates.
             tool_dispatch: Async callable ``(category, name, params) -> dict``
                            that executes a tool and returns its output as a dict.
+            record_output: Persist each completed task's output to
+                           ``plan_tasks.output``. When False the output is only
+                           kept in memory for ``{{task:ID.field}}`` resolution
+                           and plan_status reports it as null.
         """
         self.db = db
         self.hitl_manager = hitl_manager
         self.tool_dispatch = tool_dispatch
+        self.record_output = record_output
 
     # ------------------------------------------------------------------
     # plan_create
@@ -328,8 +343,11 @@ class PlanTools:
     async def execute(self, req: PlanExecuteRequest) -> PlanExecuteResponse:
         """Execute a plan synchronously, blocking until all tasks complete.
 
-        Tasks within the same dependency level execute concurrently via
-        asyncio.gather. Failure handling respects the plan's on_failure policy.
+        Each task starts as soon as all of its dependencies have finished, so
+        independent branches never wait on a slower sibling; ready tasks run
+        concurrently. Failure handling respects the plan's on_failure policy;
+        under ``stop`` no new task starts after a failure, but tasks that were
+        already running finish and keep their result.
 
         Raises:
             PlanNotFoundError: If the plan does not exist.
@@ -359,11 +377,18 @@ class PlanTools:
         )
         all_task_rows = await cur.fetchall()
         all_tasks = [dict(r) for r in all_task_rows]
-
-        # Group by execution level
-        levels: Dict[int, List[Dict]] = defaultdict(list)
-        for task in all_tasks:
-            levels[task["execution_level"]].append(task)
+        # Parse depends_on once; everything below works on the lists
+        for t in all_tasks:
+            t["depends_on"] = _parse_json_field(t["depends_on"], [])
+
+        # Dependency bookkeeping for ready-queue scheduling: a task becomes
+        # ready once every dependency has finished (completed, failed or skipped)
+        deps_by_id: Dict[str, List[str]] = {t["id"]: t["depends_on"] for t in all_tasks}
+        pending_deps: Dict[str, int] = {tid: len(deps) for tid, deps in deps_by_id.items()}
+        dependents: Dict[str, List[str]] = defaultdict(list)
+        for tid, deps in deps_by_id.items():
+            for dep in deps:
+                dependents[dep].append(tid)
 
         now = _now_iso()
         await conn.execute(
@@ -377,60 +402,74 @@ class PlanTools:
         failed_task_ids: Set[str] = set()  # all failed tasks (for counting)
         skip_ids: Set[str] = set()          # tasks whose dependents must be skipped
         stop_all = False                    # True when a stop-policy task has failed
+        cancelled = False                   # True once the plan is cancelled externally
 
         # Build a quick id→task map for policy lookups
         task_by_id: Dict[str, Dict] = {t["id"]: t for t in all_tasks}
 
+        # Tasks come back ordered by level, so roots start in a stable order
+        ready: List[str] = [t["id"] for t in all_tasks if pending_deps[t["id"]] == 0]
+        running: Dict[asyncio.Task, Dict] = {}
+
+        def _release_dependents(task_id: str) -> None:
+            for child in dependents[task_id]:
+                pending_deps[child] -= 1
+                if pending_deps[child] == 0:
+                    ready.append(child)
+
         try:
-            for level_idx in sorted(levels.keys()):
-                # Check for external cancellation
-                cur = await conn.execute(
-                    "SELECT status FROM plan_plans WHERE id = ?", (plan_id,)
-                )
-                plan_row = await cur.fetchone()
-                if plan_row and plan_row["status"] == "cancelled":
-                    break
-
-                level_tasks = levels[level_idx]
-                tasks_to_run: List[Dict] = []
-                tasks_to_skip: List[Dict] = []
-
-                for task in level_tasks:
-                    deps = _parse_json_field(task["depends_on"], [])
-                    is_blocked = (
-                        stop_all
-                        or task["id"] in skip_ids
-                        or any(d in skip_ids for d in deps)
-                    )
-                    if is_blocked:
-                        tasks_to_skip.append(task)
-                    else:
-                        tasks_to_run.append(task)
-
-                # Mark skipped tasks
-                skip_now = _now_iso()
-                for task in tasks_to_skip:
-                    await conn.execute(
-                        """UPDATE plan_tasks SET status = 'skipped', completed_at = ?
-                           WHERE id = ? AND plan_id = ?""",
-                        (skip_now, task["id"], plan_id),
+            while ready or running:
+                if ready and not cancelled:
+                    # Check for external cancellation before starting more work
+                    cur = await conn.execute(
+                        "SELECT status FROM plan_plans WHERE id = ?", (plan_id,)
                     )
-                if tasks_to_skip:
-                    await conn.commit()
-
-                if not tasks_to_run:
+                    plan_row = await cur.fetchone()
+                    cancelled = bool(plan_row and plan_row["status"] == "cancelled")
+
+                if cancelled:
+                    # Start nothing new; let in-flight tasks finish below
+                    ready.clear()
+                elif ready:
+                    batch = list(ready)
+                    ready.clear()
+                    skip_now = _now_iso()
+                    skipped_any = False
+                    for task_id in batch:
+                        is_blocked = (
+                            stop_all
+                            or task_id in skip_ids
+                            or any(d in skip_ids for d in deps_by_id[task_id])
+                        )
+                        if is_blocked:
+                            await conn.execute(
+                                """UPDATE plan_tasks SET status = 'skipped', completed_at = ?
+                                   WHERE id = ? AND plan_id = ?""",
+                                (skip_now, task_id, plan_id),
+                            )
+                            skipped_any = True
+                            _release_dependents(task_id)
+                        else:
+                            # Start the task as soon as its dependencies are done
+                            coro = self._execute_task(
+                                plan_id, task_by_id[task_id], task_outputs, plan
+                            )
+                            running[asyncio.create_task(coro)] = task_by_id[task_id]
+                    if skipped_any:
+                        await conn.commit()
+                    if ready:
+                        # Skips released more tasks; schedule them before waiting
+                        continue
+
+                if not running:
                     continue
 
-                # Execute all tasks at this level concurrently
-                coroutines = [
-                    self._execute_task(plan_id, task, task_outputs, plan)
-                    for task in tasks_to_run
-                ]
-                results = await asyncio.gather(*coroutines, return_exceptions=True)
-
-                for task, result in zip(tasks_to_run, results):
-                    if isinstance(result, Exception):
-                        task_id = task["id"]
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    task = running.pop(fut)
+                    task_id = task["id"]
+                    exc = fut.exception()
+                    if exc is not None:
                         failed_task_ids.add(task_id)
                         # Determine effective policy for THIS failing task
                         effective_policy = task["on_failure"] or plan["on_failure"]
@@ -442,10 +481,15 @@ class PlanTools:
                             skip_ids.update(transitive)
                         # "continue": don't block anything
                     else:
-                        task_id, output = result
+                        _, output = fut.result()
                         task_outputs[task_id] = output
+                    _release_dependents(task_id)
 
         except asyncio.CancelledError:
+            for fut in running:
+                fut.cancel()
+            # Let cancelled tasks finish their own writes before the plan row
+            await asyncio.gather(*running, return_exceptions=True)
             await conn.execute(
                 "UPDATE plan_plans SET status = 'cancelled', completed_at = ? WHERE id = ?",
                 (_now_iso(), plan_id),
@@ -554,7 +598,10 @@ class PlanTools:
                 task["tool_category"], task["tool_name"], resolved_params
             )
             output_dict: Dict = output if isinstance(output, dict) else {"result": str(output)}
-            await self._update_task(conn, plan_id, task_id, "completed", output=output_dict)
+            await self._update_task(
+                conn, plan_id, task_id, "completed",
+                output=output_dict if self.record_output else None,
+            )
             return task_id, output_dict
 
         except Exception as e:
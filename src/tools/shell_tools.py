@@ -2,8 +2,11 @@
 
 import os
 import asyncio
+import codecs
+import re
 import shlex
 import time
+from functools import lru_cache
 from typing import Optional
 
 from src.models import ShellExecuteRequest, ShellExecuteResponse
@@ -13,19 +16,68 @@ from src.logging_config import get_logger
 logger = get_logger(__name__)
 
 
-# Command allowlist - these commands can be executed without HITL if no dangerous flags
-ALLOWED_COMMANDS = {
+# Command allowlist - these commands can be executed without HITL if no dangerous flags.
+# Frozen: _check_command_safety caches verdicts keyed only on the command.
+ALLOWED_COMMANDS = frozenset({
     "ls", "cat", "echo", "pwd", "whoami", "date", "which", "head", "tail",
     "grep", "find", "wc", "sort", "uniq", "diff", "tree", "file", "stat",
     "git", "python", "python3", "node", "npm", "pip", "pip3", "docker",
     "curl", "wget", "jq", "sed", "awk", "cut", "tr", "basename", "dirname",
-}
+})
 
 # Dangerous shell metacharacters that require HITL
-DANGEROUS_METACHARACTERS = {
+DANGEROUS_METACHARACTERS = frozenset({
     ';', '|', '&', '>', '<', '`', '$', '(', ')', '{', '}', '[', ']',
     '*', '?', '~', '!', '^', '\n', '\r',
-}
+})
+# The same set as one character class, so the check is a single scan
+_METACHAR_RE = re.compile(
+    "[" + "".join(re.escape(c) for c in sorted(DANGEROUS_METACHARACTERS)) + "]"
+)
+
+# shlex.split only treats quotes and backslash specially; without them a
+# command is just runs of non-whitespace (shlex's whitespace set)
+_SHLEX_SPECIAL_CHARS = frozenset("\"'\\")
+_SHLEX_TOKEN_RE = re.compile(r"[^ \t\r\n]+")
+
+# Per-stream cap on captured output; anything beyond it is read and discarded
+MAX_OUTPUT_SIZE = 100000  # 100KB
+_READ_CHUNK_SIZE = 8192
+
+
+async def _read_capped(stream: asyncio.StreamReader, limit: int) -> tuple[bytes, int]:
+    """Read *stream* to EOF keeping at most *limit* bytes.
+
+    The child must be drained to completion (or it blocks on a full pipe),
+    but only the first *limit* bytes are held in memory.
+
+    Returns:
+        Tuple of (kept_bytes, total_bytes_read)
+    """
+    kept = bytearray()
+    total = 0
+    while True:
+        chunk = await stream.read(_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        total += len(chunk)
+        room = limit - len(kept)
+        if room > 0:
+            kept += chunk[:room]
+    return bytes(kept), total
+
+
+def _decode_output(data: bytes, total: int) -> str:
+    """Decode captured output, noting if it was cut at MAX_OUTPUT_SIZE.
+
+    When the cap split a multibyte UTF-8 character, the partial character
+    is dropped rather than decoded as U+FFFD.
+    """
+    if total <= len(data):
+        return data.decode('utf-8', errors='replace')
+    # A non-final incremental decode holds back an incomplete trailing sequence
+    text = codecs.getincrementaldecoder('utf-8')(errors='replace').decode(data)
+    return text + f"\n\n[Output truncated: {total} bytes total]"
 
 
 class ShellTools:
@@ -39,7 +91,8 @@ class ShellTools:
         """
         self.workspace = workspace
     
-    def _parse_command(self, command: str) -> tuple[str, list[str]]:
+    @staticmethod
+    def _parse_command(command: str) -> tuple[str, list[str]]:
         """Parse command into base command and arguments.
         
         Args:
@@ -54,11 +107,14 @@ class ShellTools:
         if not command or not command.strip():
             raise ValueError("Command cannot be empty")
         
-        # Parse command using shlex
-        try:
-            parts = shlex.split(command)
-        except ValueError as e:
-            raise ValueError(f"Invalid command syntax: {str(e)}")
+        # Plain commands (the common case) skip shlex's per-character loop
+        if _SHLEX_SPECIAL_CHARS.isdisjoint(command):
+            parts = _SHLEX_TOKEN_RE.findall(command)
+        else:
+            try:
+                parts = shlex.split(command)
+            except ValueError as e:
+                raise ValueError(f"Invalid command syntax: {str(e)}")
         
         if not parts:
             raise ValueError("Command cannot be empty")
@@ -68,9 +124,14 @@ class ShellTools:
         
         return base_command, args
     
-    def _check_command_safety(self, command: str) -> tuple[bool, str]:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _check_command_safety(command: str) -> tuple[bool, str]:
         """Check if command is safe to execute without HITL.
         
+        The verdict depends only on the command string and the module-level
+        allowlist, so results are cached; agents repeat the same commands.
+        
         Args:
             command: Shell command string
             
@@ -78,13 +139,13 @@ class ShellTools:
             Tuple of (is_safe, reason)
         """
         # Check for dangerous metacharacters
-        for char in DANGEROUS_METACHARACTERS:
-            if char in command:
-                return False, f"Contains dangerous metacharacter: '{char}'"
+        match = _METACHAR_RE.search(command)
+        if match:
+            return False, f"Contains dangerous metacharacter: '{match.group()}'"
         
         # Parse command
         try:
-            base_command, args = self._parse_command(command)
+            base_command, args = ShellTools._parse_command(command)
         except ValueError as e:
             return False, str(e)
         
@@ -154,10 +215,18 @@ class ShellTools:
                 env=env,
             )
             
+            async def collect_output():
+                (out, out_total), (err, err_total) = await asyncio.gather(
+                    _read_capped(process.stdout, MAX_OUTPUT_SIZE),
+                    _read_capped(process.stderr, MAX_OUTPUT_SIZE),
+                )
+                await process.wait()
+                return out, out_total, err, err_total
+
             # Wait for completion with timeout
             try:
-                stdout_bytes, stderr_bytes = await asyncio.wait_for(
-                    process.communicate(),
+                stdout_bytes, stdout_total, stderr_bytes, stderr_total = await asyncio.wait_for(
+                    collect_output(),
                     timeout=request.timeout,
                 )
             except asyncio.TimeoutError:
@@ -169,18 +238,11 @@ class ShellTools:
                     f"Consider increasing the timeout parameter."
                 )
             
-            # Decode output
-            stdout = stdout_bytes.decode('utf-8', errors='replace')
-            stderr = stderr_bytes.decode('utf-8', errors='replace')
+            # Decode output, marking streams that were cut off at the cap
+            stdout = _decode_output(stdout_bytes, stdout_total)
+            stderr = _decode_output(stderr_bytes, stderr_total)
             exit_code = process.returncode
             
-            # Truncate large outputs
-            max_output_size = 100000  # 100KB
-            if len(stdout) > max_output_size:
-                stdout = stdout[:max_output_size] + f"\n\n[Output truncated: {len(stdout)} bytes total]"
-            if len(stderr) > max_output_size:
-                stderr = stderr[:max_output_size] + f"\n\n[Output truncated: {len(stderr)} bytes total]"
-            
             duration_ms = int((time.time() - start_time) * 1000)
             
             logger.info(
@@ -32,6 +32,17 @@ class WorkspaceManager:
         
         logger.info("workspace_initialized", base_dir=self.base_dir)
     
+    @property
+    def base_dir(self) -> str:
+        """Resolved base workspace directory."""
+        return self._base_dir
+    
+    @base_dir.setter
+    def base_dir(self, value: str) -> None:
+        self._base_dir = value
+        # Separator-terminated base for containment checks ("/ws/" so "/ws2" fails)
+        self._base_prefix = os.path.join(value, "")
+    
     def resolve_path(
         self,
         user_path: str,
@@ -65,12 +76,17 @@ class WorkspaceManager:
         if workspace_override:
             effective_workspace = os.path.realpath(workspace_override)
             # Workspace override must be within base workspace
-            if not effective_workspace.startswith(self.base_dir):
+            if (
+                effective_workspace != self.base_dir
+                and not effective_workspace.startswith(self._base_prefix)
+            ):
                 raise SecurityError(
                     f"Workspace override '{workspace_override}' is outside base workspace"
                 )
+            workspace_prefix = os.path.join(effective_workspace, "")
         else:
             effective_workspace = self.base_dir
+            workspace_prefix = self._base_prefix
         
         # Resolve the path
         if os.path.isabs(user_path):
@@ -84,7 +100,7 @@ class WorkspaceManager:
         
         # CRITICAL: Security check - must be within workspace boundaries
         # Use realpath to resolve symlinks, then check prefix
-        if not resolved.startswith(effective_workspace + os.sep) and resolved != effective_workspace:
+        if resolved != effective_workspace and not resolved.startswith(workspace_prefix):
             raise SecurityError(
                 f"Path '{user_path}' resolves to '{resolved}' which escapes workspace boundary '{effective_workspace}'"
             )
@@ -109,7 +125,7 @@ class WorkspaceManager:
         """
         try:
             resolved = os.path.realpath(path)
-            return resolved.startswith(self.base_dir + os.sep) or resolved == self.base_dir
+            return resolved == self.base_dir or resolved.startswith(self._base_prefix)
         except Exception:
             return False
     
@@ -0,0 +1,31 @@
+"""Shared pytest configuration for the HostBridge test suite."""
+
+import asyncio
+
+import pytest
+
+try:
+    import uvloop
+except ImportError:  # uvloop ships with uvicorn[standard] but is optional
+    uvloop = None
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(config, item):
+    """Run async tests and fixtures on uvloop when it is installed."""
+    if uvloop is None:
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The FastAPI application, imported on first use.
+
+    The import is deferred so test modules can set their environment
+    (``DB_PATH``, ``WORKSPACE_BASE_DIR``) at collection time before
+    ``src.main`` builds its module-level singletons.
+    """
+    from src.main import app as _app
+
+    return _app
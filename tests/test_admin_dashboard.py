@@ -1,76 +1,104 @@
 """Tests for admin dashboard API endpoints and related UX behavior."""
 
+import asyncio
 import os
 import sys
-import tempfile
 import json
 import pytest
+import pytest_asyncio
 from pathlib import Path
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 from httpx import AsyncClient, ASGITransport
 
-# Set up test environment BEFORE any imports
-TEST_WORKSPACE = tempfile.mkdtemp()
-TEST_DATA_DIR = tempfile.mkdtemp()
+@pytest.fixture(scope="module")
+def workspace(tmp_path_factory):
+    """Dashboard test workspace; removed with pytest's other temp dirs."""
+    return str(tmp_path_factory.mktemp("dashboard_workspace"))
 
 
-@pytest.fixture
-async def client():
-    """Create test client."""
-    # Set environment variables before importing
-    os.environ["WORKSPACE_BASE_DIR"] = TEST_WORKSPACE
-    os.environ["DB_PATH"] = os.path.join(TEST_DATA_DIR, "hostbridge.db")
+@pytest.fixture(scope="module", autouse=True)
+def _env(workspace, tmp_path_factory):
+    """Set the app's workspace and DB env vars before it is imported; restored afterwards."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("WORKSPACE_BASE_DIR", workspace)
+        mp.setenv("DB_PATH", str(tmp_path_factory.mktemp("dashboard_data") / "hostbridge.db"))
+        yield
+
 
-    # Patch config loading
+@pytest_asyncio.fixture(scope="module")
+async def client(workspace):
+    """Test client shared by the whole module; the DB is connected once."""
     import src.config
     original_load = src.config.load_config
 
     def patched_load(config_path="config.yaml"):
         cfg = original_load(config_path)
-        cfg.workspace.base_dir = TEST_WORKSPACE
+        cfg.workspace.base_dir = workspace
         return cfg
 
-    src.config.load_config = patched_load
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(src.config, "load_config", patched_load)
 
-    # Now import the app and initialize database
-    from src.main import app, db
+        # Now import the app and initialize database
+        from src import main as main_module
+        from src.main import app, db
 
-    # Connect to database before tests
-    await db.connect()
+        # Point the already-built singletons at this module's workspace
+        mp.setattr(main_module.config.workspace, "base_dir", workspace)
+        mp.setattr(main_module.workspace_manager, "base_dir", os.path.realpath(workspace))
 
-    from src import main as main_module
-    main_module.config.workspace.base_dir = TEST_WORKSPACE
-    main_module.workspace_manager.base_dir = os.path.realpath(TEST_WORKSPACE)
+        await db.connect()
 
-    async with AsyncClient(
-        transport=ASGITransport(app=app, raise_app_exceptions=False),
-        base_url="http://test",
-    ) as ac:
-        yield ac
+        async with AsyncClient(
+            transport=ASGITransport(app=app, raise_app_exceptions=False),
+            base_url="http://test",
+        ) as ac:
+            yield ac
 
-    # Cleanup
-    await db.close()
+        await db.close()
 
-    # Restore originals
-    src.config.load_config = original_load
 
-
-@pytest.fixture
-async def auth_headers(client):
-    """Create authenticated session by logging in."""
-    # Login first
+async def _login(client):
+    """Log in and return the session cookies, leaving the client's jar empty."""
     response = await client.post(
         "/admin/api/login",
         json={"password": "admin"}
     )
     assert response.status_code == 200
 
-    # Return cookies for subsequent requests
+    # Tests pass the cookies explicitly; keep the shared client unauthenticated
     cookies = response.cookies
+    client.cookies.clear()
     return cookies
 
 
+@pytest_asyncio.fixture(scope="module")
+async def auth_headers(client):
+    """Create an authenticated session once for the module."""
+    return await _login(client)
+
+
+@pytest.fixture
+async def fresh_auth_headers(client):
+    """A session of the test's own, for tests that log it out."""
+    return await _login(client)
+
+
+@pytest.fixture(autouse=True)
+def _reset_client_cookies(client):
+    """Start every test with an empty cookie jar on the shared client."""
+    client.cookies.clear()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def tools_listing(client, auth_headers):
+    """The /admin/api/tools payload, fetched once for the read-only explorer tests."""
+    response = await client.get("/admin/api/tools", cookies=auth_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
 class TestDetailedHealthEndpoint:
     """Tests for the detailed health endpoint."""
 
@@ -136,12 +164,9 @@ class TestToolExplorerEndpoint:
     """Tests for the tool explorer endpoints."""
 
     @pytest.mark.asyncio
-    async def test_list_tools_returns_tools(self, client, auth_headers):
+    async def test_list_tools_returns_tools(self, tools_listing):
         """Test that list tools returns a list of tools."""
-        response = await client.get("/admin/api/tools", cookies=auth_headers)
-
-        assert response.status_code == 200
-        data = response.json()
+        data = tools_listing
 
         assert "tools" in data
         assert "total" in data
@@ -155,12 +180,9 @@ class TestToolExplorerEndpoint:
         assert response.status_code == 401
 
     @pytest.mark.asyncio
-    async def test_tool_schema_has_required_fields(self, client, auth_headers):
+    async def test_tool_schema_has_required_fields(self, tools_listing):
         """Test that each tool has required fields."""
-        response = await client.get("/admin/api/tools", cookies=auth_headers)
-
-        assert response.status_code == 200
-        data = response.json()
+        data = tools_listing
 
         required_fields = ["name", "category", "description", "input_schema", "requires_hitl"]
 
@@ -169,13 +191,9 @@ class TestToolExplorerEndpoint:
                 assert field in tool, f"Tool missing field: {field}"
 
     @pytest.mark.asyncio
-    async def test_get_specific_tool_schema(self, client, auth_headers):
+    async def test_get_specific_tool_schema(self, client, auth_headers, tools_listing):
         """Test getting schema for a specific tool."""
-        # First get the list of tools
-        list_response = await client.get("/admin/api/tools", cookies=auth_headers)
-        assert list_response.status_code == 200
-
-        tools = list_response.json()["tools"]
+        tools = tools_listing["tools"]
         if len(tools) > 0:
             tool = tools[0]
             response = await client.get(
@@ -188,6 +206,22 @@ class TestToolExplorerEndpoint:
             assert data["name"] == tool["name"]
             assert data["category"] == tool["category"]
 
+    @pytest.mark.asyncio
+    async def test_every_listed_tool_has_schema(self, client, auth_headers, tools_listing):
+        """Test that every tool in the listing resolves to its own schema."""
+        tools = tools_listing["tools"]
+        # The jar is reset after each test; requests below are independent
+        client.cookies.update(auth_headers)
+        responses = await asyncio.gather(*(
+            client.get(f"/admin/api/tools/{tool['category']}/{tool['name']}")
+            for tool in tools
+        ))
+
+        for tool, response in zip(tools, responses):
+            assert response.status_code == 200, f"{tool['category']}/{tool['name']}"
+            data = response.json()
+            assert (data["category"], data["name"]) == (tool["category"], tool["name"])
+
     @pytest.mark.asyncio
     async def test_get_nonexistent_tool_returns_404(self, client, auth_headers):
         """Test that getting a nonexistent tool returns 404."""
@@ -463,16 +497,16 @@ class TestAuthenticationFlow:
 
         assert response.status_code == 401
 
-    async def test_logout(self, client, auth_headers):
+    async def test_logout(self, client, fresh_auth_headers):
         """Test logout."""
-        response = await client.post("/admin/api/logout", cookies=auth_headers)
+        response = await client.post("/admin/api/logout", cookies=fresh_auth_headers)
         assert response.status_code == 200
 
-    async def test_access_protected_endpoint_after_logout(self, client, auth_headers):
+    async def test_access_protected_endpoint_after_logout(self, client, fresh_auth_headers):
         """Test that protected endpoints are inaccessible after logout."""
         # Logout
-        await client.post("/admin/api/logout", cookies=auth_headers)
+        await client.post("/admin/api/logout", cookies=fresh_auth_headers)
 
         # Try to access protected endpoint
-        response = await client.get("/admin/api/health", cookies=auth_headers)
+        response = await client.get("/admin/api/health", cookies=fresh_auth_headers)
         assert response.status_code == 401
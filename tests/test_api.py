@@ -12,13 +12,18 @@ TEST_WORKSPACE = tempfile.mkdtemp()
 TEST_DATA_DIR = tempfile.mkdtemp()
 
 
+@pytest.fixture(scope="module", autouse=True)
+def _env():
+    """Set the app's environment once for the module instead of on every client."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("WORKSPACE_BASE_DIR", TEST_WORKSPACE)
+        mp.setenv("DB_PATH", os.path.join(TEST_DATA_DIR, "hostbridge.db"))
+        yield
+
+
 @pytest.fixture
 async def client():
     """Create test client."""
-    # Set environment variables before importing
-    os.environ["WORKSPACE_BASE_DIR"] = TEST_WORKSPACE
-    os.environ["DB_PATH"] = os.path.join(TEST_DATA_DIR, "hostbridge.db")
-    
     # Patch config loading
     import src.config
     original_load = src.config.load_config
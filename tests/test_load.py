@@ -7,6 +7,7 @@ These tests verify the system can handle:
 """
 
 import asyncio
+import json
 import os
 import tempfile
 import time
@@ -15,13 +16,43 @@ from statistics import mean, median
 import pytest
 from httpx import AsyncClient, ASGITransport
 
-# Set up test environment BEFORE any imports
-TEST_WORKSPACE = tempfile.mkdtemp()
-TEST_DATA_DIR = tempfile.mkdtemp()
+# Temp dirs for the app under test (wired into the env by the _env fixture)
+# Prefix temp dirs with the xdist worker id so parallel workers never share paths
+_WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", "main")
+TEST_WORKSPACE = tempfile.mkdtemp(prefix=f"hb_{_WORKER_ID}_")
+TEST_DATA_DIR = tempfile.mkdtemp(prefix=f"hb_{_WORKER_ID}_")
 
-# Set environment variables BEFORE importing any src modules
-os.environ["WORKSPACE_BASE_DIR"] = TEST_WORKSPACE
-os.environ["DB_PATH"] = os.path.join(TEST_DATA_DIR, "hostbridge.db")
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Upper bound on in-flight requests per test, so raising the task counts
+# does not turn into an unbounded burst of coroutines.
+CONCURRENCY = 32
+
+
+async def _bounded_as_completed(coros):
+    """Run *coros* with at most CONCURRENCY in flight, yielding results as they finish."""
+    sem = asyncio.Semaphore(CONCURRENCY)
+
+    async def bounded(coro):
+        async with sem:
+            return await coro
+
+    tasks = [asyncio.ensure_future(bounded(coro)) for coro in coros]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _env():
+    """Point the app at this module's temp dirs; undone when the module finishes."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("WORKSPACE_BASE_DIR", TEST_WORKSPACE)
+        mp.setenv("DB_PATH", os.path.join(TEST_DATA_DIR, "hostbridge.db"))
+        yield
 
 
 @pytest.fixture
@@ -40,6 +71,11 @@ async def client():
     from src.main import app, db
     await db.connect()
 
+    # Database.connect() already enables WAL; relax fsyncs so the concurrent
+    # audit inserts are not serialized behind per-commit disk flushes.
+    await db.connection.execute("PRAGMA synchronous=NORMAL")
+    await db.connection.execute("PRAGMA temp_store=MEMORY")
+
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
 
@@ -53,16 +89,23 @@ class TestConcurrentAccess:
     @pytest.mark.asyncio
     async def test_concurrent_file_writes(self, client):
         """Test multiple concurrent file write operations."""
-        async def write_file(i):
+        # Encode payloads up front so the tasks only do request I/O
+        payloads = [
+            json.dumps({"path": f"concurrent_{i}.txt", "content": f"content_{i}"}).encode()
+            for i in range(10)
+        ]
+
+        async def write_file(body):
             response = await client.post(
                 "/api/tools/fs/write",
-                json={"path": f"concurrent_{i}.txt", "content": f"content_{i}"}
+                content=body,
+                headers=_JSON_HEADERS,
             )
             return response.status_code
 
         # Execute 10 concurrent writes
-        tasks = [write_file(i) for i in range(10)]
-        results = await asyncio.gather(*tasks)
+        tasks = [write_file(body) for body in payloads]
+        results = [r async for r in _bounded_as_completed(tasks)]
 
         # All should succeed
         success_count = sum(1 for r in results if r == 200)
@@ -86,10 +129,10 @@ class TestConcurrentAccess:
 
         # Execute 20 concurrent reads
         tasks = [read_file() for _ in range(20)]
-        results = await asyncio.gather(*tasks)
 
         # All should succeed
-        assert all(r == 200 for r in results)
+        async for status in _bounded_as_completed(tasks):
+            assert status == 200
 
     @pytest.mark.asyncio
     async def test_concurrent_directory_listings(self, client):
@@ -103,10 +146,10 @@ class TestConcurrentAccess:
 
         # Execute 15 concurrent listings
         tasks = [list_dir() for _ in range(15)]
-        results = await asyncio.gather(*tasks)
 
         # All should succeed
-        assert all(r == 200 for r in results)
+        async for status in _bounded_as_completed(tasks):
+            assert status == 200
 
 
 class TestResponseTimes:
@@ -1,22 +1,51 @@
 """Tests for MCP endpoint."""
 
+import json
 import os
 import tempfile
 import pytest
 from httpx import AsyncClient, ASGITransport
 
-# Set up test environment BEFORE any imports
-TEST_WORKSPACE = tempfile.mkdtemp()
-TEST_DATA_DIR = tempfile.mkdtemp()
+# Temp dirs for the app under test (wired into the env by the _env fixture)
+# Prefix temp dirs with the xdist worker id so parallel workers never share paths
+_WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", "main")
+TEST_WORKSPACE = tempfile.mkdtemp(prefix=f"hb_{_WORKER_ID}_")
+TEST_DATA_DIR = tempfile.mkdtemp(prefix=f"hb_{_WORKER_ID}_")
+
+# JSON-RPC payloads are constant, so encode them once instead of per request
+_JSON_HEADERS = {"Content-Type": "application/json", "Accept": "application/json"}
+
+_INIT_BODY = json.dumps({
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {"name": "test-client", "version": "1.0.0"}
+    }
+}).encode()
+
+_LIST_BODY = json.dumps({
+    "jsonrpc": "2.0",
+    "id": 2,
+    "method": "tools/list",
+    "params": {}
+}).encode()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _env():
+    """Point the app at this module's temp dirs; undone when the module finishes."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("WORKSPACE_BASE_DIR", TEST_WORKSPACE)
+        mp.setenv("DB_PATH", os.path.join(TEST_DATA_DIR, "hostbridge.db"))
+        yield
 
 
 @pytest.fixture
 async def client():
     """Create test client."""
-    # Set environment variables before importing
-    os.environ["WORKSPACE_BASE_DIR"] = TEST_WORKSPACE
-    os.environ["DB_PATH"] = os.path.join(TEST_DATA_DIR, "hostbridge.db")
-
     # Patch config loading
     import src.config
     original_load = src.config.load_config
@@ -58,36 +87,49 @@ async def client():
     src.config.load_config = original_load
 
 
+@pytest.fixture(scope="module")
+def openapi_spec():
+    """OpenAPI spec and its /api/tools/* operation IDs, generated once per module."""
+    from src.main import app
+
+    spec = app.openapi()
+    tool_ops = frozenset(
+        operation["operationId"]
+        for path, path_item in spec.get("paths", {}).items()
+        if path.startswith("/api/tools/")
+        for method, operation in path_item.items()
+        if method in ("get", "post", "put", "patch", "delete")
+        and isinstance(operation, dict)
+        and "operationId" in operation
+    )
+    return {"spec": spec, "tool_ops": tool_ops}
+
+
+async def _mcp_tools_list(client):
+    """Run the MCP initialize handshake and return the ``tools/list`` response."""
+    init_response = await client.post("/mcp", content=_INIT_BODY, headers=_JSON_HEADERS)
+
+    headers = _JSON_HEADERS
+    session_id = init_response.headers.get("Mcp-Session-Id")
+    if session_id:
+        headers = {**_JSON_HEADERS, "Mcp-Session-Id": session_id}
+
+    return await client.post("/mcp", content=_LIST_BODY, headers=headers)
+
+
 class TestMCPStreamableHTTP:
     """Test MCP Streamable HTTP endpoint functionality."""
     
     @pytest.mark.asyncio
     async def test_mcp_initialize(self, client):
-        """Test MCP initialize handshake."""
-        init_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {
-                    "name": "test-client",
-                    "version": "1.0.0"
-                }
-            }
-        }
-        
-        response = await client.post(
-            "/mcp",
-            json=init_request,
-            headers={
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-        )
+        """Test MCP initialize handshake over Streamable HTTP (not legacy SSE)."""
+        # Streamable HTTP uses POST for all requests and answers with plain
+        # JSON; legacy SSE would use GET and return an event stream.
+        response = await client.post("/mcp", content=_INIT_BODY, headers=_JSON_HEADERS)
         
         assert response.status_code == 200
+        assert response.headers.get("content-type") == "application/json"
+        assert "text/event-stream" not in response.headers.get("content-type", "")
         result = response.json()
         
         # Check response structure
@@ -112,40 +154,8 @@ class TestMCPStreamableHTTP:
     @pytest.mark.asyncio
     async def test_mcp_tools_list(self, client):
         """Test listing tools via MCP."""
-        # First initialize
-        init_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {"name": "test", "version": "1.0"}
-            }
-        }
-        
-        init_response = await client.post(
-            "/mcp",
-            json=init_request,
-            headers={"Content-Type": "application/json", "Accept": "application/json"}
-        )
-        
-        session_id = init_response.headers.get("Mcp-Session-Id")
-        
-        # Now list tools
-        list_request = {
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/list",
-            "params": {}
-        }
-        
-        headers = {"Content-Type": "application/json", "Accept": "application/json"}
-        if session_id:
-            headers["Mcp-Session-Id"] = session_id
-        
-        response = await client.post("/mcp", json=list_request, headers=headers)
-        
+        response = await _mcp_tools_list(client)
+
         assert response.status_code == 200
         result = response.json()
         
@@ -166,36 +176,6 @@ class TestMCPStreamableHTTP:
         for tool in tools:
             assert "name" in tool
             assert "description" in tool
-    
-    @pytest.mark.asyncio
-    async def test_mcp_transport_is_streamable_http(self, client):
-        """Verify that Streamable HTTP transport is being used (not legacy SSE)."""
-        # Streamable HTTP uses POST for all requests
-        # Legacy SSE would use GET and return event stream
-        
-        # Try POST (should work with Streamable HTTP)
-        init_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {"name": "test", "version": "1.0"}
-            }
-        }
-        
-        response = await client.post(
-            "/mcp",
-            json=init_request,
-            headers={"Content-Type": "application/json", "Accept": "application/json"}
-        )
-        
-        assert response.status_code == 200
-        assert response.headers.get("content-type") == "application/json"
-        
-        # Verify it's not SSE (which would have text/event-stream)
-        assert "text/event-stream" not in response.headers.get("content-type", "")
 
 
 class TestMCPToolParity:
@@ -218,9 +198,10 @@ class TestMCPToolParity:
         # HTTP tools
         "http_request",
         # Memory tools
-        "memory_store", "memory_get", "memory_search", "memory_update",
-        "memory_delete", "memory_link", "memory_children", "memory_ancestors",
-        "memory_related", "memory_subtree", "memory_roots", "memory_stats",
+        "memory_store", "memory_bulk_store", "memory_get", "memory_search",
+        "memory_update", "memory_delete", "memory_link", "memory_children",
+        "memory_ancestors", "memory_related", "memory_subtree", "memory_roots",
+        "memory_stats",
         # Plan tools
         "plan_create", "plan_execute", "plan_status", "plan_list", "plan_cancel",
     }
@@ -244,39 +225,7 @@ class TestMCPToolParity:
     @pytest.mark.asyncio
     async def test_mcp_contains_all_expected_tools(self, client):
         """Test that MCP contains all expected tool operation IDs including Docker tools."""
-        # First initialize
-        init_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {"name": "test", "version": "1.0"}
-            }
-        }
-
-        init_response = await client.post(
-            "/mcp",
-            json=init_request,
-            headers={"Content-Type": "application/json", "Accept": "application/json"}
-        )
-
-        session_id = init_response.headers.get("Mcp-Session-Id")
-
-        # List tools
-        list_request = {
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/list",
-            "params": {}
-        }
-
-        headers = {"Content-Type": "application/json", "Accept": "application/json"}
-        if session_id:
-            headers["Mcp-Session-Id"] = session_id
-
-        response = await client.post("/mcp", json=list_request, headers=headers)
+        response = await _mcp_tools_list(client)
 
         assert response.status_code == 200
         result = response.json()
@@ -290,39 +239,7 @@ class TestMCPToolParity:
     @pytest.mark.asyncio
     async def test_mcp_excludes_admin_operations(self, client):
         """Test that MCP does NOT expose admin/auth/non-tool operations."""
-        # First initialize
-        init_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {"name": "test", "version": "1.0"}
-            }
-        }
-
-        init_response = await client.post(
-            "/mcp",
-            json=init_request,
-            headers={"Content-Type": "application/json", "Accept": "application/json"}
-        )
-
-        session_id = init_response.headers.get("Mcp-Session-Id")
-
-        # List tools
-        list_request = {
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/list",
-            "params": {}
-        }
-
-        headers = {"Content-Type": "application/json", "Accept": "application/json"}
-        if session_id:
-            headers["Mcp-Session-Id"] = session_id
-
-        response = await client.post("/mcp", json=list_request, headers=headers)
+        response = await _mcp_tools_list(client)
 
         assert response.status_code == 200
         result = response.json()
@@ -334,55 +251,11 @@ class TestMCPToolParity:
         assert not leaked_operations, f"MCP incorrectly exposes admin operations: {leaked_operations}"
 
     @pytest.mark.asyncio
-    async def test_openapi_mcp_tool_parity(self, client):
+    async def test_openapi_mcp_tool_parity(self, client, openapi_spec):
         """Test that OpenAPI tool operation IDs match MCP tool names."""
-        from src.main import app
-
-        # Get OpenAPI spec
-        openapi_spec = app.openapi()
-
-        # Extract operation IDs from OpenAPI spec for tool routes only
-        openapi_tool_ops = set()
-        for path, path_item in openapi_spec.get("paths", {}).items():
-            # Only include /api/tools/* paths
-            if path.startswith("/api/tools/"):
-                for method, operation in path_item.items():
-                    if method in ("get", "post", "put", "patch", "delete"):
-                        if isinstance(operation, dict) and "operationId" in operation:
-                            openapi_tool_ops.add(operation["operationId"])
-
-        # Get MCP tools
-        init_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {"name": "test", "version": "1.0"}
-            }
-        }
-
-        init_response = await client.post(
-            "/mcp",
-            json=init_request,
-            headers={"Content-Type": "application/json", "Accept": "application/json"}
-        )
-
-        session_id = init_response.headers.get("Mcp-Session-Id")
-
-        list_request = {
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/list",
-            "params": {}
-        }
-
-        headers = {"Content-Type": "application/json", "Accept": "application/json"}
-        if session_id:
-            headers["Mcp-Session-Id"] = session_id
+        openapi_tool_ops = openapi_spec["tool_ops"]
 
-        response = await client.post("/mcp", json=list_request, headers=headers)
+        response = await _mcp_tools_list(client)
 
         assert response.status_code == 200
         result = response.json()
@@ -401,37 +274,7 @@ class TestMCPToolParity:
     @pytest.mark.asyncio
     async def test_docker_tools_in_mcp(self, client):
         """Test that Docker tools are included in MCP (regression test for G1 gap)."""
-        init_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {"name": "test", "version": "1.0"}
-            }
-        }
-
-        init_response = await client.post(
-            "/mcp",
-            json=init_request,
-            headers={"Content-Type": "application/json", "Accept": "application/json"}
-        )
-
-        session_id = init_response.headers.get("Mcp-Session-Id")
-
-        list_request = {
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/list",
-            "params": {}
-        }
-
-        headers = {"Content-Type": "application/json", "Accept": "application/json"}
-        if session_id:
-            headers["Mcp-Session-Id"] = session_id
-
-        response = await client.post("/mcp", json=list_request, headers=headers)
+        response = await _mcp_tools_list(client)
 
         assert response.status_code == 200
         result = response.json()
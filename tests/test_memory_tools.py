@@ -1,52 +1,105 @@
 """Tests for MemoryTools — knowledge graph storage, retrieval, and traversal."""
 
+import asyncio
 import json
 import os
-import tempfile
+import uuid
+from types import SimpleNamespace
 
 import pytest
 import pytest_asyncio
 
-# ---------------------------------------------------------------------------
-# Set DB path BEFORE any app imports so the module-level Database() uses it
-# ---------------------------------------------------------------------------
-_TEST_DB_DIR = tempfile.mkdtemp()
-_TEST_DB_PATH = os.path.join(_TEST_DB_DIR, "test_memory.db")
-_TEST_WORKSPACE = tempfile.mkdtemp()
-
-os.environ.setdefault("DB_PATH", _TEST_DB_PATH)
-os.environ["DB_PATH"] = _TEST_DB_PATH
-os.environ["WORKSPACE_BASE_DIR"] = _TEST_WORKSPACE
+from src.database import Database
+from src.models import (
+    MemoryAncestorsRequest,
+    MemoryBulkStoreRequest,
+    MemoryChildrenRequest,
+    MemoryDeleteRequest,
+    MemoryGetRequest,
+    MemoryLinkRequest,
+    MemoryRelatedRequest,
+    MemorySearchRequest,
+    MemoryStoreRelation,
+    MemoryStoreRequest,
+    MemorySubtreeRequest,
+    MemoryUpdateRequest,
+)
+from src.tools.memory_tools import MemoryTools, NodeNotFoundError
+
+# Shared-cache in-memory DB: lives as long as memory_db's connection, no disk I/O.
+# Named per xdist worker so parallel workers never share one database.
+_WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", "main")
+_TEST_DB_PATH = f"file:hb_memory_{_WORKER_ID}?mode=memory&cache=shared"
 
 
 # ---------------------------------------------------------------------------
 # Fixtures
 # ---------------------------------------------------------------------------
 
+@pytest.fixture(scope="module")
+def app_paths(tmp_path_factory):
+    """Workspace dir and secrets file for the app, created only once tests run."""
+    workspace = tmp_path_factory.mktemp("memory_workspace")
+    secrets = tmp_path_factory.mktemp("memory_secrets") / "secrets.env"
+    secrets.write_text("TOKEN=secret123\n")
+    return SimpleNamespace(workspace=str(workspace), secrets=str(secrets))
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _env(app_paths):
+    """Point the app at this module's DB and workspace; undone when the module finishes."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DB_PATH", _TEST_DB_PATH)
+        mp.setenv("WORKSPACE_BASE_DIR", app_paths.workspace)
+        yield
+
+
+# Clears the memory graph between tests in a single executor round-trip
+_WIPE_MEMORY_SQL = """
+DELETE FROM memory_edges;
+DELETE FROM memory_nodes;
+INSERT INTO memory_nodes_fts(memory_nodes_fts) VALUES('delete-all');
+"""
+
+
+async def _tune_test_connection(conn):
+    """Keep sort/index temp tables and a larger page cache in memory.
+
+    The test DB is a shared-cache in-memory database, so there are no fsyncs
+    or file pages to tune; only temp storage and cache size still matter.
+    """
+    await conn.execute("PRAGMA temp_store=MEMORY")
+    await conn.execute("PRAGMA cache_size=-65536")
+
+
 @pytest_asyncio.fixture(scope="module")
 async def memory_db():
     """A connected Database instance used for unit-level MemoryTools tests."""
-    from src.database import Database
-
     db = Database(_TEST_DB_PATH)
     await db.connect()
+    await _tune_test_connection(db.connection)
     yield db
     await db.close()
 
 
+@pytest.fixture(scope="module")
+def module_memory_tools(memory_db):
+    """One MemoryTools instance shared by every test in the module."""
+    return MemoryTools(memory_db)
+
+
 @pytest_asyncio.fixture
-async def memory_tools(memory_db):
-    """Fresh MemoryTools instance (but reuses the same DB connection)."""
-    from src.tools.memory_tools import MemoryTools
+async def memory_tools(memory_db, module_memory_tools):
+    """The shared MemoryTools instance, with memory tables wiped first.
 
-    # Wipe tables before each test for isolation
+    MemoryTools commits inside store/link/update/delete, and a COMMIT
+    releases any open SAVEPOINT, so isolation comes from the wipe rather
+    than from rolling back a per-test savepoint.
+    """
     conn = memory_db.connection
-    await conn.execute("DELETE FROM memory_edges")
-    await conn.execute("DELETE FROM memory_nodes")
-    await conn.execute("INSERT INTO memory_nodes_fts(memory_nodes_fts) VALUES('rebuild')")
-    await conn.commit()
+    await conn.executescript(_WIPE_MEMORY_SQL)
 
-    return MemoryTools(memory_db)
+    return module_memory_tools
 
 
 # ---------------------------------------------------------------------------
@@ -59,8 +112,6 @@ class TestMemoryStore:
     @pytest.mark.asyncio
     async def test_store_minimal(self, memory_tools):
         """Store with content only generates a node with defaults."""
-        from src.models import MemoryStoreRequest
-
         req = MemoryStoreRequest(content="Python is a programming language")
         result = await memory_tools.store(req)
 
@@ -72,8 +123,6 @@ class TestMemoryStore:
     @pytest.mark.asyncio
     async def test_store_with_name(self, memory_tools):
         """Explicit name overrides content-derived name."""
-        from src.models import MemoryStoreRequest
-
         req = MemoryStoreRequest(content="Long content here", name="My Node")
         result = await memory_tools.store(req)
 
@@ -82,8 +131,6 @@ class TestMemoryStore:
     @pytest.mark.asyncio
     async def test_store_name_truncated_to_60_chars(self, memory_tools):
         """Content longer than 60 chars is truncated for the auto-name."""
-        from src.models import MemoryStoreRequest
-
         content = "A" * 80
         req = MemoryStoreRequest(content=content)
         result = await memory_tools.store(req)
@@ -93,8 +140,6 @@ class TestMemoryStore:
     @pytest.mark.asyncio
     async def test_store_with_tags_and_metadata(self, memory_tools):
         """Tags and metadata are persisted correctly."""
-        from src.models import MemoryStoreRequest, MemoryGetRequest
-
         req = MemoryStoreRequest(
             content="Test node",
             tags=["python", "testing"],
@@ -112,8 +157,6 @@ class TestMemoryStore:
     @pytest.mark.asyncio
     async def test_store_with_relations(self, memory_tools):
         """Storing with relations creates edges to existing nodes."""
-        from src.models import MemoryStoreRequest, MemoryStoreRelation
-
         # Create a target node first
         target = await memory_tools.store(MemoryStoreRequest(content="Target node"))
 
@@ -128,9 +171,6 @@ class TestMemoryStore:
     @pytest.mark.asyncio
     async def test_store_with_invalid_relation_target_raises(self, memory_tools):
         """Referencing a non-existent target ID raises NodeNotFoundError."""
-        from src.models import MemoryStoreRequest, MemoryStoreRelation
-        from src.tools.memory_tools import NodeNotFoundError
-
         req = MemoryStoreRequest(
             content="Source node",
             relations=[MemoryStoreRelation(target_id="nonexistent-id", relation="related_to")],
@@ -139,6 +179,64 @@ class TestMemoryStore:
             await memory_tools.store(req)
 
 
+class TestMemoryBulkStore:
+    """Tests for memory_bulk_store."""
+
+    @pytest.mark.asyncio
+    async def test_bulk_store_returns_nodes_in_order(self, memory_tools):
+        """Each item becomes a node, reported in request order."""
+        result = await memory_tools.bulk_store(MemoryBulkStoreRequest(items=[
+            MemoryStoreRequest(content="First"),
+            MemoryStoreRequest(content="Second", name="Named"),
+        ]))
+
+        assert result.total == 2
+        assert [n.name for n in result.nodes] == ["First", "Named"]
+        got = await memory_tools.get(MemoryGetRequest(id=result.nodes[1].id, include_relations=False))
+        assert got.node.content == "Second"
+
+    @pytest.mark.asyncio
+    async def test_bulk_store_invalid_relation_stores_nothing(self, memory_tools):
+        """A bad relation target anywhere in the batch rejects the whole batch."""
+        with pytest.raises(NodeNotFoundError):
+            await memory_tools.bulk_store(MemoryBulkStoreRequest(items=[
+                MemoryStoreRequest(content="Fine"),
+                MemoryStoreRequest(
+                    content="Broken",
+                    relations=[MemoryStoreRelation(target_id="ghost", relation="related_to")],
+                ),
+            ]))
+
+        stats = await memory_tools.stats()
+        assert stats.total_nodes == 0
+
+    @pytest.mark.asyncio
+    async def test_bulk_store_failed_insert_rolls_back(self, memory_tools, monkeypatch):
+        """A failing insert partway through leaves none of the batch behind."""
+        real_insert = memory_tools._insert_node
+        calls = 0
+
+        async def insert_then_fail(item, now):
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                raise RuntimeError("insert failed")
+            return await real_insert(item, now)
+
+        monkeypatch.setattr(memory_tools, "_insert_node", insert_then_fail)
+        with pytest.raises(RuntimeError, match="insert failed"):
+            await memory_tools.bulk_store(MemoryBulkStoreRequest(items=[
+                MemoryStoreRequest(content="First"),
+                MemoryStoreRequest(content="Second"),
+            ]))
+        monkeypatch.undo()
+
+        # A later commit on the shared connection must not flush the first row
+        await memory_tools.store(MemoryStoreRequest(content="Unrelated"))
+        stats = await memory_tools.stats()
+        assert stats.total_nodes == 1
+
+
 # ---------------------------------------------------------------------------
 # TestMemoryGet
 # ---------------------------------------------------------------------------
@@ -149,8 +247,6 @@ class TestMemoryGet:
     @pytest.mark.asyncio
     async def test_get_existing_node(self, memory_tools):
         """Retrieving a stored node returns full node details."""
-        from src.models import MemoryStoreRequest, MemoryGetRequest
-
         stored = await memory_tools.store(MemoryStoreRequest(
             content="Knowledge about Python", name="Python node"
         ))
@@ -163,17 +259,12 @@ class TestMemoryGet:
     @pytest.mark.asyncio
     async def test_get_nonexistent_raises(self, memory_tools):
         """Retrieving a non-existent node raises NodeNotFoundError."""
-        from src.models import MemoryGetRequest
-        from src.tools.memory_tools import NodeNotFoundError
-
         with pytest.raises(NodeNotFoundError):
             await memory_tools.get(MemoryGetRequest(id="does-not-exist"))
 
     @pytest.mark.asyncio
     async def test_get_includes_outgoing_relations(self, memory_tools):
         """Relations include outgoing edges."""
-        from src.models import MemoryStoreRequest, MemoryStoreRelation, MemoryGetRequest
-
         target = await memory_tools.store(MemoryStoreRequest(content="Target"))
         source = await memory_tools.store(MemoryStoreRequest(
             content="Source",
@@ -189,8 +280,6 @@ class TestMemoryGet:
     @pytest.mark.asyncio
     async def test_get_includes_incoming_relations(self, memory_tools):
         """Relations include incoming edges."""
-        from src.models import MemoryStoreRequest, MemoryStoreRelation, MemoryGetRequest
-
         target = await memory_tools.store(MemoryStoreRequest(content="Target"))
         await memory_tools.store(MemoryStoreRequest(
             content="Source",
@@ -205,8 +294,6 @@ class TestMemoryGet:
     @pytest.mark.asyncio
     async def test_get_without_relations(self, memory_tools):
         """include_relations=False returns empty relations list."""
-        from src.models import MemoryStoreRequest, MemoryGetRequest
-
         stored = await memory_tools.store(MemoryStoreRequest(content="Solo node"))
         result = await memory_tools.get(MemoryGetRequest(id=stored.id, include_relations=False))
 
@@ -217,34 +304,40 @@ class TestMemoryGet:
 # TestMemorySearch
 # ---------------------------------------------------------------------------
 
+# Search requests are read-only inputs, so build and validate them once
+_ML_FULLTEXT_REQ = MemorySearchRequest(query="machine learning", search_mode="fulltext")
+_PYTHON_TAG_REQ = MemorySearchRequest(query="", tags=["python"], search_mode="tags")
+_DEPLOY_TASK_REQ = MemorySearchRequest(query="deploy", entity_type="task", search_mode="fulltext")
+_PYTHON_TIP_TOP3_REQ = MemorySearchRequest(query="Python tip", max_results=3, search_mode="fulltext")
+_ANYTHING_REQ = MemorySearchRequest(query="anything")
+_FULL_NAME_QUESTION_REQ = MemorySearchRequest(
+    query="What do you know about Keyur Golani?", search_mode="fulltext"
+)
+_FIRST_NAME_QUESTION_REQ = MemorySearchRequest(
+    query="What do you know about Keyur?", search_mode="fulltext"
+)
+
+
 class TestMemorySearch:
     """Tests for memory_search."""
 
     @pytest.mark.asyncio
     async def test_fulltext_search_finds_matching_node(self, memory_tools):
         """Full-text search returns nodes matching the query."""
-        from src.models import MemoryStoreRequest, MemorySearchRequest
-
-        await memory_tools.store(MemoryStoreRequest(
+        stored = await memory_tools.store(MemoryStoreRequest(
             content="Machine learning is a subset of artificial intelligence",
             tags=["ML", "AI"],
         ))
         await memory_tools.store(MemoryStoreRequest(content="Unrelated topic"))
 
-        result = await memory_tools.search(MemorySearchRequest(
-            query="machine learning",
-            search_mode="fulltext",
-        ))
+        result = await memory_tools.search(_ML_FULLTEXT_REQ)
 
         assert result.total_matches >= 1
-        texts = [r.node.content for r in result.results]
-        assert any("machine learning" in t.lower() for t in texts)
+        assert result.results[0].node.id == stored.id
 
     @pytest.mark.asyncio
     async def test_tag_search(self, memory_tools):
         """Tags-only search filters by exact tag values."""
-        from src.models import MemoryStoreRequest, MemorySearchRequest
-
         await memory_tools.store(MemoryStoreRequest(
             content="Python tutorial", tags=["python", "tutorial"]
         ))
@@ -252,11 +345,7 @@ class TestMemorySearch:
             content="JavaScript tutorial", tags=["javascript"]
         ))
 
-        result = await memory_tools.search(MemorySearchRequest(
-            query="",
-            tags=["python"],
-            search_mode="tags",
-        ))
+        result = await memory_tools.search(_PYTHON_TAG_REQ)
 
         assert result.total_matches == 1
         assert result.results[0].node.tags == ["python", "tutorial"]
@@ -264,8 +353,6 @@ class TestMemorySearch:
     @pytest.mark.asyncio
     async def test_search_entity_type_filter(self, memory_tools):
         """entity_type filter narrows search results."""
-        from src.models import MemoryStoreRequest, MemorySearchRequest
-
         await memory_tools.store(MemoryStoreRequest(
             content="Deploy the app", entity_type="task"
         ))
@@ -273,74 +360,53 @@ class TestMemorySearch:
             content="Deployment concept", entity_type="concept"
         ))
 
-        result = await memory_tools.search(MemorySearchRequest(
-            query="deploy",
-            entity_type="task",
-            search_mode="fulltext",
-        ))
+        result = await memory_tools.search(_DEPLOY_TASK_REQ)
 
         assert all(r.node.entity_type == "task" for r in result.results)
 
     @pytest.mark.asyncio
     async def test_search_max_results_respected(self, memory_tools):
         """max_results caps the number of returned results."""
-        from src.models import MemoryStoreRequest, MemorySearchRequest
-
+        # Inputs are trusted, so skip pydantic validation inside the loop
         for i in range(6):
-            await memory_tools.store(MemoryStoreRequest(
+            await memory_tools.store(MemoryStoreRequest.model_construct(
                 content=f"Python tip number {i}"
             ))
 
-        result = await memory_tools.search(MemorySearchRequest(
-            query="Python tip",
-            max_results=3,
-            search_mode="fulltext",
-        ))
+        result = await memory_tools.search(_PYTHON_TIP_TOP3_REQ)
 
         assert len(result.results) <= 3
 
     @pytest.mark.asyncio
     async def test_search_empty_graph_returns_empty(self, memory_tools):
         """Searching an empty graph returns zero results."""
-        from src.models import MemorySearchRequest
-
-        result = await memory_tools.search(MemorySearchRequest(query="anything"))
+        result = await memory_tools.search(_ANYTHING_REQ)
         assert result.total_matches == 0
         assert result.results == []
 
     @pytest.mark.asyncio
     async def test_fulltext_search_handles_natural_language_question_for_full_name(self, memory_tools):
         """Question-shaped queries should still match person names in stored memory."""
-        from src.models import MemoryStoreRequest, MemorySearchRequest
-
-        await memory_tools.store(MemoryStoreRequest(
+        stored = await memory_tools.store(MemoryStoreRequest(
             content="I am Keyur Golani and I own a Honda Accord Hybrid car.",
         ))
 
-        result = await memory_tools.search(MemorySearchRequest(
-            query="What do you know about Keyur Golani?",
-            search_mode="fulltext",
-        ))
+        result = await memory_tools.search(_FULL_NAME_QUESTION_REQ)
 
         assert result.total_matches >= 1
-        assert any("Keyur Golani" in r.node.content for r in result.results)
+        assert result.results[0].node.id == stored.id
 
     @pytest.mark.asyncio
     async def test_fulltext_search_handles_natural_language_question_for_single_name(self, memory_tools):
         """Question-shaped queries should match even when wrapped around a single keyword."""
-        from src.models import MemoryStoreRequest, MemorySearchRequest
-
-        await memory_tools.store(MemoryStoreRequest(
+        stored = await memory_tools.store(MemoryStoreRequest(
             content="Keyur likes Honda cars.",
         ))
 
-        result = await memory_tools.search(MemorySearchRequest(
-            query="What do you know about Keyur?",
-            search_mode="fulltext",
-        ))
+        result = await memory_tools.search(_FIRST_NAME_QUESTION_REQ)
 
         assert result.total_matches >= 1
-        assert any("Keyur" in r.node.content for r in result.results)
+        assert result.results[0].node.id == stored.id
 
 
 # ---------------------------------------------------------------------------
@@ -353,22 +419,19 @@ class TestMemoryUpdate:
     @pytest.mark.asyncio
     async def test_update_content(self, memory_tools):
         """Updating content changes the stored value."""
-        from src.models import MemoryStoreRequest, MemoryUpdateRequest, MemoryGetRequest
-
         stored = await memory_tools.store(MemoryStoreRequest(content="Old content"))
         result = await memory_tools.update(MemoryUpdateRequest(
             id=stored.id, content="New content"
         ))
 
         assert result.previous_content == "Old content"
-        node = await memory_tools.get(MemoryGetRequest(id=stored.id))
+        assert result.node["content"] == "New content"
+        node = await memory_tools.get(MemoryGetRequest(id=stored.id, include_relations=False))
         assert node.node.content == "New content"
 
     @pytest.mark.asyncio
     async def test_update_metadata_merged(self, memory_tools):
         """Metadata update merges with existing keys."""
-        from src.models import MemoryStoreRequest, MemoryUpdateRequest, MemoryGetRequest
-
         stored = await memory_tools.store(MemoryStoreRequest(
             content="Node", metadata={"key1": "val1", "key2": "val2"}
         ))
@@ -376,7 +439,7 @@ class TestMemoryUpdate:
             id=stored.id, metadata={"key2": "updated", "key3": "new"}
         ))
 
-        node = await memory_tools.get(MemoryGetRequest(id=stored.id))
+        node = await memory_tools.get(MemoryGetRequest(id=stored.id, include_relations=False))
         assert node.node.metadata["key1"] == "val1"   # preserved
         assert node.node.metadata["key2"] == "updated"  # updated
         assert node.node.metadata["key3"] == "new"     # added
@@ -384,9 +447,6 @@ class TestMemoryUpdate:
     @pytest.mark.asyncio
     async def test_update_nonexistent_raises(self, memory_tools):
         """Updating a non-existent node raises NodeNotFoundError."""
-        from src.models import MemoryUpdateRequest
-        from src.tools.memory_tools import NodeNotFoundError
-
         with pytest.raises(NodeNotFoundError):
             await memory_tools.update(MemoryUpdateRequest(id="no-such-id", content="x"))
 
@@ -401,9 +461,6 @@ class TestMemoryDelete:
     @pytest.mark.asyncio
     async def test_delete_node(self, memory_tools):
         """Deleting a node removes it from the graph."""
-        from src.models import MemoryStoreRequest, MemoryDeleteRequest, MemoryGetRequest
-        from src.tools.memory_tools import NodeNotFoundError
-
         stored = await memory_tools.store(MemoryStoreRequest(content="To be deleted"))
         result = await memory_tools.delete(MemoryDeleteRequest(id=stored.id))
 
@@ -415,8 +472,6 @@ class TestMemoryDelete:
     @pytest.mark.asyncio
     async def test_delete_counts_edges(self, memory_tools):
         """deleted_edges count reflects actual edges removed."""
-        from src.models import MemoryStoreRequest, MemoryStoreRelation, MemoryDeleteRequest
-
         target = await memory_tools.store(MemoryStoreRequest(content="Target"))
         source = await memory_tools.store(MemoryStoreRequest(
             content="Source",
@@ -429,8 +484,6 @@ class TestMemoryDelete:
     @pytest.mark.asyncio
     async def test_delete_lists_orphaned_children(self, memory_tools):
         """Deleting a parent lists orphaned children when cascade=false."""
-        from src.models import MemoryStoreRequest, MemoryLinkRequest, MemoryDeleteRequest
-
         parent = await memory_tools.store(MemoryStoreRequest(content="Parent"))
         child = await memory_tools.store(MemoryStoreRequest(content="Child"))
         await memory_tools.link(MemoryLinkRequest(
@@ -444,9 +497,6 @@ class TestMemoryDelete:
     @pytest.mark.asyncio
     async def test_delete_nonexistent_raises(self, memory_tools):
         """Deleting a non-existent node raises NodeNotFoundError."""
-        from src.models import MemoryDeleteRequest
-        from src.tools.memory_tools import NodeNotFoundError
-
         with pytest.raises(NodeNotFoundError):
             await memory_tools.delete(MemoryDeleteRequest(id="ghost"))
 
@@ -461,10 +511,10 @@ class TestMemoryLink:
     @pytest.mark.asyncio
     async def test_link_creates_edge(self, memory_tools):
         """Creating a link returns created=True and an edge ID."""
-        from src.models import MemoryStoreRequest, MemoryLinkRequest
-
-        a = await memory_tools.store(MemoryStoreRequest(content="Node A"))
-        b = await memory_tools.store(MemoryStoreRequest(content="Node B"))
+        a, b = await asyncio.gather(
+            memory_tools.store(MemoryStoreRequest(content="Node A")),
+            memory_tools.store(MemoryStoreRequest(content="Node B")),
+        )
 
         result = await memory_tools.link(MemoryLinkRequest(
             source_id=a.id, target_id=b.id, relation="related_to"
@@ -477,10 +527,10 @@ class TestMemoryLink:
     @pytest.mark.asyncio
     async def test_link_update_existing_returns_created_false(self, memory_tools):
         """Linking the same pair again returns created=False (update)."""
-        from src.models import MemoryStoreRequest, MemoryLinkRequest
-
-        a = await memory_tools.store(MemoryStoreRequest(content="A"))
-        b = await memory_tools.store(MemoryStoreRequest(content="B"))
+        a, b = await asyncio.gather(
+            memory_tools.store(MemoryStoreRequest(content="A")),
+            memory_tools.store(MemoryStoreRequest(content="B")),
+        )
 
         await memory_tools.link(MemoryLinkRequest(
             source_id=a.id, target_id=b.id, relation="depends_on"
@@ -494,18 +544,20 @@ class TestMemoryLink:
     @pytest.mark.asyncio
     async def test_link_bidirectional_creates_two_edges(self, memory_tools):
         """bidirectional=True creates both directions."""
-        from src.models import MemoryStoreRequest, MemoryLinkRequest, MemoryGetRequest
-
-        a = await memory_tools.store(MemoryStoreRequest(content="A"))
-        b = await memory_tools.store(MemoryStoreRequest(content="B"))
+        a, b = await asyncio.gather(
+            memory_tools.store(MemoryStoreRequest(content="A")),
+            memory_tools.store(MemoryStoreRequest(content="B")),
+        )
 
         await memory_tools.link(MemoryLinkRequest(
             source_id=a.id, target_id=b.id, relation="related_to", bidirectional=True
         ))
 
         # Both nodes should have the relation
-        node_a = await memory_tools.get(MemoryGetRequest(id=a.id))
-        node_b = await memory_tools.get(MemoryGetRequest(id=b.id))
+        node_a, node_b = await asyncio.gather(
+            memory_tools.get(MemoryGetRequest(id=a.id)),
+            memory_tools.get(MemoryGetRequest(id=b.id)),
+        )
 
         a_relations = {r.neighbor["id"] for r in node_a.relations}
         b_relations = {r.neighbor["id"] for r in node_b.relations}
@@ -516,9 +568,6 @@ class TestMemoryLink:
     @pytest.mark.asyncio
     async def test_link_nonexistent_source_raises(self, memory_tools):
         """Linking from a non-existent source raises NodeNotFoundError."""
-        from src.models import MemoryStoreRequest, MemoryLinkRequest
-        from src.tools.memory_tools import NodeNotFoundError
-
         b = await memory_tools.store(MemoryStoreRequest(content="B"))
         with pytest.raises(NodeNotFoundError):
             await memory_tools.link(MemoryLinkRequest(
@@ -530,44 +579,57 @@ class TestMemoryLink:
 # TestGraphTraversal
 # ---------------------------------------------------------------------------
 
+@pytest_asyncio.fixture(scope="class")
+async def tree(memory_db):
+    """
+    Build a simple tree:
+        root
+        ├── child1
+        │   └── grandchild
+        └── child2
+    All connected via parent_of edges.
+
+    Rows are inserted directly with executemany rather than through
+    store()/link(), which each do several lookups and a commit. The tree
+    is built once for the class; tests that add nodes must remove them.
+    """
+    nodes = {
+        key: SimpleNamespace(id=str(uuid.uuid4()), name=name)
+        for key, name in (
+            ("root", "root"), ("child1", "child1"),
+            ("child2", "child2"), ("gc", "grandchild"),
+        )
+    }
+    # parent_of: source is parent, target is child
+    edges = [("root", "child1"), ("root", "child2"), ("child1", "gc")]
+
+    conn = memory_db.connection
+    await conn.executescript(_WIPE_MEMORY_SQL)
+    await conn.executemany(
+        "INSERT INTO memory_nodes (id, name, content) VALUES (?, ?, ?)",
+        [(n.id, n.name, n.name) for n in nodes.values()],
+    )
+    await conn.executemany(
+        "INSERT INTO memory_edges (id, source_id, target_id, relation) "
+        "VALUES (?, ?, ?, 'parent_of')",
+        [(str(uuid.uuid4()), nodes[src].id, nodes[dst].id) for src, dst in edges],
+    )
+    await conn.commit()
+
+    return nodes
+
+
 class TestGraphTraversal:
     """Tests for memory_children, memory_ancestors, memory_roots, memory_related, memory_subtree."""
 
-    @pytest_asyncio.fixture
-    async def tree(self, memory_tools):
-        """
-        Build a simple tree:
-            root
-            ├── child1
-            │   └── grandchild
-            └── child2
-        All connected via parent_of edges.
-        """
-        from src.models import MemoryStoreRequest, MemoryLinkRequest
-
-        root = await memory_tools.store(MemoryStoreRequest(content="root", name="root"))
-        child1 = await memory_tools.store(MemoryStoreRequest(content="child1", name="child1"))
-        child2 = await memory_tools.store(MemoryStoreRequest(content="child2", name="child2"))
-        gc = await memory_tools.store(MemoryStoreRequest(content="grandchild", name="grandchild"))
-
-        # parent_of: source is parent, target is child
-        await memory_tools.link(MemoryLinkRequest(
-            source_id=root.id, target_id=child1.id, relation="parent_of"
-        ))
-        await memory_tools.link(MemoryLinkRequest(
-            source_id=root.id, target_id=child2.id, relation="parent_of"
-        ))
-        await memory_tools.link(MemoryLinkRequest(
-            source_id=child1.id, target_id=gc.id, relation="parent_of"
-        ))
-
-        return {"root": root, "child1": child1, "child2": child2, "gc": gc}
+    @pytest.fixture
+    def memory_tools(self, module_memory_tools, tree):
+        """Shared MemoryTools without the per-test wipe, so the class tree survives."""
+        return module_memory_tools
 
     @pytest.mark.asyncio
     async def test_children_returns_immediate_children(self, memory_tools, tree):
         """memory_children returns direct children only."""
-        from src.models import MemoryChildrenRequest
-
         result = await memory_tools.children(MemoryChildrenRequest(id=tree["root"].id))
         ids = {n.id for n in result.nodes}
         assert tree["child1"].id in ids
@@ -578,8 +640,6 @@ class TestGraphTraversal:
     @pytest.mark.asyncio
     async def test_ancestors_returns_all_ancestors(self, memory_tools, tree):
         """memory_ancestors returns all ancestors up to max_depth."""
-        from src.models import MemoryAncestorsRequest
-
         result = await memory_tools.ancestors(MemoryAncestorsRequest(id=tree["gc"].id))
         ids = {n.id for n in result.nodes}
         assert tree["child1"].id in ids
@@ -598,8 +658,6 @@ class TestGraphTraversal:
     @pytest.mark.asyncio
     async def test_related_returns_connected_nodes(self, memory_tools, tree):
         """memory_related returns all directly connected nodes (any edge type)."""
-        from src.models import MemoryRelatedRequest
-
         result = await memory_tools.related(MemoryRelatedRequest(id=tree["root"].id))
         ids = {n.id for n in result.nodes}
         assert tree["child1"].id in ids
@@ -608,17 +666,18 @@ class TestGraphTraversal:
     @pytest.mark.asyncio
     async def test_related_with_relation_filter(self, memory_tools, tree):
         """memory_related with relation filter narrows results."""
-        from src.models import MemoryRelatedRequest, MemoryStoreRequest, MemoryLinkRequest
-
         # Add a non-parent_of edge
         sibling = await memory_tools.store(MemoryStoreRequest(content="sibling"))
-        await memory_tools.link(MemoryLinkRequest(
-            source_id=tree["root"].id, target_id=sibling.id, relation="related_to"
-        ))
+        try:
+            await memory_tools.link(MemoryLinkRequest(
+                source_id=tree["root"].id, target_id=sibling.id, relation="related_to"
+            ))
 
-        result = await memory_tools.related(MemoryRelatedRequest(
-            id=tree["root"].id, relation="related_to"
-        ))
+            result = await memory_tools.related(MemoryRelatedRequest(
+                id=tree["root"].id, relation="related_to"
+            ))
+        finally:
+            await memory_tools.delete(MemoryDeleteRequest(id=sibling.id))
         ids = {n.id for n in result.nodes}
         assert sibling.id in ids
         assert tree["child1"].id not in ids  # connected by parent_of, not related_to
@@ -626,8 +685,6 @@ class TestGraphTraversal:
     @pytest.mark.asyncio
     async def test_subtree_returns_all_descendants(self, memory_tools, tree):
         """memory_subtree returns all descendants excluding the root itself."""
-        from src.models import MemorySubtreeRequest
-
         result = await memory_tools.subtree(MemorySubtreeRequest(id=tree["root"].id))
         ids = {n.id for n in result.nodes}
         assert tree["child1"].id in ids
@@ -638,8 +695,6 @@ class TestGraphTraversal:
     @pytest.mark.asyncio
     async def test_subtree_respects_max_depth(self, memory_tools, tree):
         """subtree with max_depth=1 returns only immediate children."""
-        from src.models import MemorySubtreeRequest
-
         result = await memory_tools.subtree(MemorySubtreeRequest(
             id=tree["root"].id, max_depth=1
         ))
@@ -651,8 +706,6 @@ class TestGraphTraversal:
     @pytest.mark.asyncio
     async def test_ancestors_depth_limit(self, memory_tools, tree):
         """Ancestors with max_depth=1 returns only immediate parent."""
-        from src.models import MemoryAncestorsRequest
-
         result = await memory_tools.ancestors(MemoryAncestorsRequest(
             id=tree["gc"].id, max_depth=1
         ))
@@ -680,8 +733,6 @@ class TestMemoryStats:
     @pytest.mark.asyncio
     async def test_stats_counts_nodes_and_edges(self, memory_tools):
         """Stats reflect actual node and edge counts."""
-        from src.models import MemoryStoreRequest, MemoryLinkRequest
-
         a = await memory_tools.store(MemoryStoreRequest(content="A", entity_type="concept"))
         b = await memory_tools.store(MemoryStoreRequest(content="B", entity_type="fact"))
         await memory_tools.link(MemoryLinkRequest(
@@ -699,8 +750,6 @@ class TestMemoryStats:
     @pytest.mark.asyncio
     async def test_stats_orphaned_nodes(self, memory_tools):
         """Orphaned node count includes nodes with no edges."""
-        from src.models import MemoryStoreRequest, MemoryLinkRequest
-
         isolated = await memory_tools.store(MemoryStoreRequest(content="Isolated"))
         connected_a = await memory_tools.store(MemoryStoreRequest(content="A"))
         connected_b = await memory_tools.store(MemoryStoreRequest(content="B"))
@@ -714,8 +763,6 @@ class TestMemoryStats:
     @pytest.mark.asyncio
     async def test_stats_tags_frequency(self, memory_tools):
         """Tags frequency reflects tag usage across nodes."""
-        from src.models import MemoryStoreRequest
-
         await memory_tools.store(MemoryStoreRequest(content="A", tags=["python", "AI"]))
         await memory_tools.store(MemoryStoreRequest(content="B", tags=["python"]))
 
@@ -729,66 +776,66 @@ class TestMemoryStats:
 # ---------------------------------------------------------------------------
 
 import src.config
-import src.database
-
-_TEST_SECRETS = tempfile.NamedTemporaryFile(mode="w", suffix=".env", delete=False)
-_TEST_SECRETS.write("TOKEN=secret123\n")
-_TEST_SECRETS.close()
-
-
-@pytest.fixture(autouse=True, scope="module")
-def setup_memory_app_env():
-    """Pin DB_PATH and workspace before any imports touch the app."""
-    os.environ["DB_PATH"] = _TEST_DB_PATH
-    os.environ["WORKSPACE_BASE_DIR"] = _TEST_WORKSPACE
 
+@pytest_asyncio.fixture(scope="module")
+async def module_app_client(memory_db, app_paths):
+    """Async test client wired to the FastAPI app, sharing memory_db's connection.
 
-@pytest_asyncio.fixture
-async def app_client():
-    """Async test client wired to the FastAPI app with a temp DB."""
-    os.environ["DB_PATH"] = _TEST_DB_PATH
-
+    Built once per module. src.main's tools captured its Database instance at
+    import time, so the already-connected memory_db connection is swapped in
+    on that instance rather than opening a second connection to the same DB.
+    """
     original_load = src.config.load_config
-    original_db_init = src.database.Database.__init__
 
     def patched_load(config_path="config.yaml"):
         cfg = original_load(config_path)
-        cfg.workspace.base_dir = _TEST_WORKSPACE
-        cfg.secrets.file = _TEST_SECRETS.name
+        cfg.workspace.base_dir = app_paths.workspace
+        cfg.secrets.file = app_paths.secrets
         return cfg
 
-    def patched_db_init(self, db_path=None):
-        original_db_init(self, _TEST_DB_PATH)
+    from httpx import AsyncClient, ASGITransport
 
-    src.config.load_config = patched_load
-    src.database.Database.__init__ = patched_db_init
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(src.config, "load_config", patched_load)
+        from src.main import app, db
 
-    from httpx import AsyncClient, ASGITransport
-    from src.main import app, db
+        mp.setattr(db, "_connection", memory_db.connection)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client
 
-    await db.connect()
 
-    # Wipe memory tables for test isolation
-    conn = db.connection
-    await conn.execute("DELETE FROM memory_edges")
-    await conn.execute("DELETE FROM memory_nodes")
-    await conn.execute("INSERT INTO memory_nodes_fts(memory_nodes_fts) VALUES('rebuild')")
-    await conn.commit()
+@pytest_asyncio.fixture
+async def app_client(memory_db, module_app_client):
+    """The module's API client, with memory tables wiped first for isolation."""
+    await memory_db.connection.executescript(_WIPE_MEMORY_SQL)
+    return module_app_client
 
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-        yield client
 
-    await db.close()
-    src.config.load_config = original_load
-    src.database.Database.__init__ = original_db_init
+# Constant request bodies, JSON-encoded once instead of on every post
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_PARIS_STORE_BODY = json.dumps(
+    {"content": "Paris is the capital of France", "tags": ["geography"]}
+).encode()
+_EIFFEL_SEARCH_BODY = json.dumps({"query": "Eiffel", "search_mode": "fulltext"}).encode()
+_MISSING_GET_BODY = json.dumps({"id": "definitely-does-not-exist"}).encode()
+_ORIGINAL_STORE_BODY = json.dumps({"content": "Original content"}).encode()
+
+
+async def _bulk_store(app_client, contents: tuple[str, ...]) -> list[str]:
+    """Store one node per content string in a single request; returns their IDs."""
+    resp = await app_client.post(
+        "/api/tools/memory/bulk_store",
+        json={"items": [{"content": c} for c in contents]},
+    )
+    assert resp.status_code == 200
+    return [n["id"] for n in resp.json()["nodes"]]
 
 
 @pytest.mark.asyncio
 async def test_api_memory_store_and_get(app_client):
     """POST /api/tools/memory/store then /get returns the stored node."""
     store_resp = await app_client.post(
-        "/api/tools/memory/store",
-        json={"content": "Paris is the capital of France", "tags": ["geography"]},
+        "/api/tools/memory/store", content=_PARIS_STORE_BODY, headers=_JSON_HEADERS
     )
     assert store_resp.status_code == 200
     store_data = store_resp.json()
@@ -805,36 +852,10 @@ async def test_api_memory_store_and_get(app_client):
     assert get_data["node"]["tags"] == ["geography"]
 
 
-@pytest.mark.asyncio
-async def test_api_memory_search(app_client):
-    """POST /api/tools/memory/search returns matching nodes."""
-    await app_client.post(
-        "/api/tools/memory/store",
-        json={"content": "The Eiffel Tower is in Paris"},
-    )
-
-    search_resp = await app_client.post(
-        "/api/tools/memory/search",
-        json={"query": "Eiffel", "search_mode": "fulltext"},
-    )
-    assert search_resp.status_code == 200
-    data = search_resp.json()
-    assert data["total_matches"] >= 1
-    contents = [r["node"]["content"] for r in data["results"]]
-    assert any("Eiffel" in c for c in contents)
-
-
 @pytest.mark.asyncio
 async def test_api_memory_link_and_children(app_client):
     """Linking two nodes via parent_of and querying children works end-to-end."""
-    parent_resp = await app_client.post(
-        "/api/tools/memory/store", json={"content": "Parent concept"}
-    )
-    child_resp = await app_client.post(
-        "/api/tools/memory/store", json={"content": "Child concept"}
-    )
-    parent_id = parent_resp.json()["id"]
-    child_id = child_resp.json()["id"]
+    parent_id, child_id = await _bulk_store(app_client, ("Parent concept", "Child concept"))
 
     link_resp = await app_client.post(
         "/api/tools/memory/link",
@@ -849,42 +870,38 @@ async def test_api_memory_link_and_children(app_client):
     )
     assert children_resp.status_code == 200
     data = children_resp.json()
-    child_ids = [n["id"] for n in data["nodes"]]
+    child_ids = {n["id"] for n in data["nodes"]}
     assert child_id in child_ids
 
 
 @pytest.mark.asyncio
-async def test_api_memory_stats(app_client):
-    """POST /api/tools/memory/stats returns graph statistics."""
-    await app_client.post(
-        "/api/tools/memory/store", json={"content": "Stats test node"}
-    )
-
-    stats_resp = await app_client.post("/api/tools/memory/stats")
-    assert stats_resp.status_code == 200
-    data = stats_resp.json()
-    assert "total_nodes" in data
-    assert data["total_nodes"] >= 1
-
-
-@pytest.mark.asyncio
-async def test_api_memory_get_nonexistent_returns_404(app_client):
-    """GET for a non-existent node returns 404."""
-    resp = await app_client.post(
-        "/api/tools/memory/get",
-        json={"id": "definitely-does-not-exist"},
-    )
-    assert resp.status_code == 404
-    data = resp.json()
-    assert data["error"] is True
-    assert data["error_type"] == "node_not_found"
+@pytest.mark.parametrize(
+    "endpoint, body, expected_status, check",
+    [
+        pytest.param(
+            "/api/tools/memory/get", _MISSING_GET_BODY, 404,
+            lambda data: data["error"] is True and data["error_type"] == "node_not_found",
+            id="get-nonexistent-404",
+        ),
+        pytest.param(
+            "/api/tools/memory/roots", None, 200,
+            lambda data: data["nodes"] == [],
+            id="roots-empty-graph",
+        ),
+    ],
+)
+async def test_api_memory_endpoint_smoke(app_client, endpoint, body, expected_status, check):
+    """Single-request endpoints return the expected status and payload shape."""
+    resp = await app_client.post(endpoint, content=body, headers=_JSON_HEADERS)
+    assert resp.status_code == expected_status
+    assert check(resp.json())
 
 
 @pytest.mark.asyncio
 async def test_api_memory_update(app_client):
     """POST /api/tools/memory/update changes node content."""
     store_resp = await app_client.post(
-        "/api/tools/memory/store", json={"content": "Original content"}
+        "/api/tools/memory/store", content=_ORIGINAL_STORE_BODY, headers=_JSON_HEADERS
     )
     node_id = store_resp.json()["id"]
 
@@ -895,36 +912,72 @@ async def test_api_memory_update(app_client):
     assert update_resp.status_code == 200
     data = update_resp.json()
     assert data["previous_content"] == "Original content"
+    assert data["node"]["content"] == "Updated content"
 
-    get_resp = await app_client.post("/api/tools/memory/get", json={"id": node_id})
-    assert get_resp.json()["node"]["content"] == "Updated content"
 
+# ---------------------------------------------------------------------------
+# Read-only API tests against a graph seeded once
+# ---------------------------------------------------------------------------
 
-@pytest.mark.asyncio
-async def test_api_memory_roots_and_subtree(app_client):
-    """Roots and subtree traversal work correctly via the API."""
-    root_resp = await app_client.post(
-        "/api/tools/memory/store", json={"content": "Root node"}
-    )
-    child_resp = await app_client.post(
-        "/api/tools/memory/store", json={"content": "Child node"}
-    )
-    root_id = root_resp.json()["id"]
-    child_id = child_resp.json()["id"]
+@pytest_asyncio.fixture(scope="class")
+async def seeded_graph(memory_db, module_app_client):
+    """Wipe the graph and seed it once per class through the API.
 
-    await app_client.post(
+        Root node ──parent_of──▶ Child node
+        The Eiffel Tower is in Paris  (unlinked)
+    """
+    await memory_db.connection.executescript(_WIPE_MEMORY_SQL)
+    root_id, child_id, eiffel_id = await _bulk_store(
+        module_app_client, ("Root node", "Child node", "The Eiffel Tower is in Paris")
+    )
+    link_resp = await module_app_client.post(
         "/api/tools/memory/link",
         json={"source_id": root_id, "target_id": child_id, "relation": "parent_of"},
     )
+    assert link_resp.status_code == 200
+    return SimpleNamespace(root_id=root_id, child_id=child_id, eiffel_id=eiffel_id)
 
-    roots_resp = await app_client.post("/api/tools/memory/roots")
-    assert roots_resp.status_code == 200
-    root_ids = [n["id"] for n in roots_resp.json()["nodes"]]
-    assert root_id in root_ids
 
-    subtree_resp = await app_client.post(
-        "/api/tools/memory/subtree", json={"id": root_id}
-    )
-    assert subtree_resp.status_code == 200
-    subtree_ids = [n["id"] for n in subtree_resp.json()["nodes"]]
-    assert child_id in subtree_ids
+class TestSeededGraphApi:
+    """Read-only memory endpoints queried against the class's seeded graph."""
+
+    @pytest.fixture
+    def app_client(self, module_app_client, seeded_graph):
+        """Shared client without the per-test wipe, so the seeded graph survives."""
+        return module_app_client
+
+    @pytest.mark.asyncio
+    async def test_api_memory_search(self, app_client):
+        """POST /api/tools/memory/search returns matching nodes."""
+        search_resp = await app_client.post(
+            "/api/tools/memory/search", content=_EIFFEL_SEARCH_BODY, headers=_JSON_HEADERS
+        )
+        assert search_resp.status_code == 200
+        assert search_resp.json()["total_matches"] >= 1
+        # The response never echoes the query, so the stored text can only come from a hit
+        assert b"The Eiffel Tower is in Paris" in search_resp.content
+
+    @pytest.mark.asyncio
+    async def test_api_memory_stats(self, app_client):
+        """POST /api/tools/memory/stats counts the seeded nodes and edges."""
+        stats_resp = await app_client.post("/api/tools/memory/stats")
+        assert stats_resp.status_code == 200
+        data = stats_resp.json()
+        assert data["total_nodes"] == 3
+        assert data["total_edges"] == 1
+
+    @pytest.mark.asyncio
+    async def test_api_memory_roots_and_subtree(self, app_client, seeded_graph):
+        """Roots and subtree traversal work correctly via the API."""
+        roots_resp, subtree_resp = await asyncio.gather(
+            app_client.post("/api/tools/memory/roots"),
+            app_client.post("/api/tools/memory/subtree", json={"id": seeded_graph.root_id}),
+        )
+        assert roots_resp.status_code == 200
+        root_ids = {n["id"] for n in roots_resp.json()["nodes"]}
+        assert seeded_graph.root_id in root_ids
+        assert seeded_graph.child_id not in root_ids
+
+        assert subtree_resp.status_code == 200
+        subtree_ids = {n["id"] for n in subtree_resp.json()["nodes"]}
+        assert seeded_graph.child_id in subtree_ids
@@ -3,8 +3,9 @@
 import asyncio
 import json
 import os
+import sqlite3
 import tempfile
-from unittest.mock import AsyncMock, MagicMock
+from types import SimpleNamespace
 
 import pytest
 import pytest_asyncio
@@ -12,14 +13,37 @@ import pytest_asyncio
 # ---------------------------------------------------------------------------
 # Set DB path BEFORE any app imports so the module-level Database() uses it
 # ---------------------------------------------------------------------------
-_TEST_DB_DIR = tempfile.mkdtemp()
-_TEST_DB_PATH = os.path.join(_TEST_DB_DIR, "test_plan.db")
-_TEST_WORKSPACE = tempfile.mkdtemp()
+# Shared-cache in-memory DB: lives as long as plan_db's connection, no disk I/O.
+# Named per xdist worker so parallel workers never share one database.
+_WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", "main")
+_TEST_DB_PATH = f"file:hb_test_plan_{_WORKER_ID}?mode=memory&cache=shared"
+# Keep the scratch workspace on tmpfs when the host provides one.
+_TMPFS_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+_TEST_WORKSPACE = tempfile.mkdtemp(dir=_TMPFS_ROOT)
 
 os.environ.setdefault("DB_PATH", _TEST_DB_PATH)
 os.environ["DB_PATH"] = _TEST_DB_PATH
 os.environ["WORKSPACE_BASE_DIR"] = _TEST_WORKSPACE
 
+from fastapi.testclient import TestClient  # noqa: E402
+
+from src.database import Database  # noqa: E402
+from src.models import (  # noqa: E402
+    PlanCancelRequest,
+    PlanCreateRequest,
+    PlanExecuteRequest,
+    PlanStatusRequest,
+    PlanTaskDef,
+)
+from src.tools.plan_tools import (  # noqa: E402
+    PlanNotFoundError,
+    PlanTools,
+    PlanValidationError,
+    _compute_execution_levels,
+    _get_transitive_dependents,
+    _resolve_task_refs,
+)
+
 
 # ---------------------------------------------------------------------------
 # Fixtures
@@ -29,44 +53,116 @@ os.environ["WORKSPACE_BASE_DIR"] = _TEST_WORKSPACE
 @pytest_asyncio.fixture(scope="module")
 async def plan_db():
     """A connected Database instance used for all plan tool tests."""
-    from src.database import Database
-
     db = Database(_TEST_DB_PATH)
     await db.connect()
+    # Trade durability for speed on the throwaway test DB; journal_mode is
+    # already set by Database.connect() and is always "memory" for this URI.
+    await db.connection.executescript(
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA cache_size=-20000;"
+        "PRAGMA busy_timeout=5000;"
+    )
     yield db
     await db.close()
 
 
-@pytest_asyncio.fixture
-async def plan_tools(plan_db):
-    """Fresh PlanTools instance — DB is shared but plan/task tables are wiped."""
-    from src.tools.plan_tools import PlanTools
+@pytest.fixture(scope="module")
+def plan_db_reader(plan_db):
+    """Synchronous read-only connection to the plan test DB for assertions.
 
-    conn = plan_db.connection
-    await conn.execute("DELETE FROM plan_tasks")
-    await conn.execute("DELETE FROM plan_plans")
-    await conn.commit()
+    Test-side verification reads are serial, so they skip aiosqlite's
+    thread hop. The shared-cache URI lets this see plan_db's committed rows.
+    """
+    conn = sqlite3.connect(_TEST_DB_PATH, uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only=1")
+    yield conn
+    conn.close()
 
-    # Default no-op dispatch: returns {"ok": True}
-    async def _dispatch(category, name, params):
-        return {"ok": True, "category": category, "name": name}
 
-    mock_hitl = MagicMock()
-    return PlanTools(plan_db, mock_hitl, _dispatch)
+async def _default_dispatch(category, name, params):
+    """Default no-op dispatch: echoes the tool it was asked to run."""
+    return {"ok": True, "category": category, "name": name}
 
 
-def _make_plan_tools(plan_db, dispatch=None, hitl=None):
-    """Helper to build a PlanTools with custom dispatch/hitl."""
-    from src.tools.plan_tools import PlanTools
+async def _wipe(conn):
+    """Clear plan and task rows in a single round-trip to the DB thread.
+
+    The test DB is a shared-cache in-memory database with a single writer, so
+    there is no lock contention to avoid; the explicit transaction just makes
+    both DELETEs one commit instead of two.
+    """
+    await conn.executescript(
+        "BEGIN IMMEDIATE; DELETE FROM plan_tasks; DELETE FROM plan_plans; COMMIT;"
+    )
+
+
+class _FakeHitl:
+    """Minimal HITLManager stand-in that records calls and returns one decision."""
+
+    def __init__(self, decision="approved"):
+        self._decision = decision
+        self.created = []
+        self.waited = []
+
+    async def create_request(self, **kwargs):
+        self.created.append(kwargs)
+        return SimpleNamespace(id=f"hitl-req-{len(self.created)}")
+
+    async def wait_for_decision(self, request_id):
+        self.waited.append(request_id)
+        return self._decision
+
+
+class PlanToolsHarness:
+    """One PlanTools instance shared by the module, with swappable collaborators.
+
+    PlanTools only keeps references to its dispatch callable and HITL manager,
+    so tests reconfigure those attributes instead of building a new instance.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.current_dispatch = _default_dispatch
+        self.tools = PlanTools(db, _FakeHitl(), self._dispatch)
+
+    async def _dispatch(self, category, name, params):
+        return await self.current_dispatch(category, name, params)
+
+    def set_dispatch(self, dispatch):
+        self.current_dispatch = dispatch
+
+    def set_hitl(self, hitl):
+        self.tools.hitl_manager = hitl
+
+    def set_record_output(self, record_output):
+        self.tools.record_output = record_output
+
+    async def reset(self):
+        """Restore the default collaborators and settings and wipe plan state."""
+        self.current_dispatch = _default_dispatch
+        self.tools.hitl_manager = _FakeHitl()
+        self.tools.record_output = True
+        await _wipe(self.db.connection)
 
-    if dispatch is None:
-        async def dispatch(category, name, params):
-            return {"ok": True}
 
-    if hitl is None:
-        hitl = MagicMock()
+@pytest.fixture(scope="module")
+def plan_harness(plan_db):
+    """The PlanToolsHarness shared by every test in this module."""
+    return PlanToolsHarness(plan_db)
 
-    return PlanTools(plan_db, hitl, dispatch)
+
+@pytest.fixture(scope="module")
+def plan_tools(plan_harness):
+    """The shared PlanTools instance; state is reset by _reset_plan_state."""
+    return plan_harness.tools
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def _reset_plan_state(plan_harness):
+    """Give each test the default dispatch/HITL and empty plan tables."""
+    await plan_harness.reset()
 
 
 # ---------------------------------------------------------------------------
@@ -74,26 +170,39 @@ def _make_plan_tools(plan_db, dispatch=None, hitl=None):
 # ---------------------------------------------------------------------------
 
 
+# Validated once; the builders below model_copy() these, which skips validation.
+_BASE_TASK = PlanTaskDef(id="__proto__", name="proto", tool_category="fs", tool_name="read")
+_BASE_REQ = PlanCreateRequest(name="__proto__", tasks=[])
+
+
 def make_task(tid, name=None, tool_cat="fs", tool_name="read", params=None, depends_on=None, on_failure=None, require_hitl=False):
-    """Build a PlanTaskDef dict quickly."""
-    from src.models import PlanTaskDef
-
-    return PlanTaskDef(
-        id=tid,
-        name=name or f"Task {tid}",
-        tool_category=tool_cat,
-        tool_name=tool_name,
-        params=params or {},
-        depends_on=depends_on or [],
-        on_failure=on_failure,
-        require_hitl=require_hitl,
+    """Build a PlanTaskDef quickly from the validated prototype."""
+    return _BASE_TASK.model_copy(
+        update={
+            "id": tid,
+            "name": name or f"Task {tid}",
+            "tool_category": tool_cat,
+            "tool_name": tool_name,
+            "params": params or {},
+            "depends_on": depends_on or [],
+            "on_failure": on_failure,
+            "require_hitl": require_hitl,
+        }
     )
 
 
 def make_create_req(name, tasks, on_failure="stop"):
-    from src.models import PlanCreateRequest
+    return _BASE_REQ.model_copy(update={"name": name, "tasks": tasks, "on_failure": on_failure})
 
-    return PlanCreateRequest(name=name, tasks=tasks, on_failure=on_failure)
+
+def make_chain(n):
+    """Build a linear chain t0 → t1 → … → t{n-1}."""
+    return [make_task(f"t{i}", depends_on=[f"t{i - 1}"] if i else None) for i in range(n)]
+
+
+def make_fanout(width):
+    """Build a root task with ``width`` children that depend only on it."""
+    return [make_task("root")] + [make_task(f"t{i}", depends_on=["root"]) for i in range(width)]
 
 
 # ---------------------------------------------------------------------------
@@ -146,17 +255,32 @@ class TestPlanCreate:
         assert result.execution_order[2] == ["end"]
 
     @pytest.mark.asyncio
-    async def test_create_empty_tasks_raises(self, plan_tools):
-        from src.tools.plan_tools import PlanValidationError
+    async def test_create_long_chain(self, plan_tools):
+        """A 1000-task chain yields one level per task, in dependency order."""
+        result = await plan_tools.create(make_create_req("long_chain", make_chain(1000)))
+
+        assert result.task_count == 1000
+        assert result.execution_levels == 1000
+        assert result.execution_order == [[f"t{i}"] for i in range(1000)]
 
+    @pytest.mark.asyncio
+    async def test_create_wide_fanout(self, plan_tools):
+        """1000 siblings of a single root all land in the second level."""
+        result = await plan_tools.create(make_create_req("wide_fanout", make_fanout(1000)))
+
+        assert result.task_count == 1001
+        assert result.execution_levels == 2
+        assert result.execution_order[0] == ["root"]
+        assert len(result.execution_order[1]) == 1000
+
+    @pytest.mark.asyncio
+    async def test_create_empty_tasks_raises(self, plan_tools):
         with pytest.raises(PlanValidationError, match="at least one task"):
             await plan_tools.create(make_create_req("empty", []))
 
     @pytest.mark.asyncio
     async def test_create_cycle_raises(self, plan_tools):
         """A → B → A is a cycle."""
-        from src.tools.plan_tools import PlanValidationError
-
         tasks = [
             make_task("a", depends_on=["b"]),
             make_task("b", depends_on=["a"]),
@@ -166,53 +290,45 @@ class TestPlanCreate:
 
     @pytest.mark.asyncio
     async def test_create_self_loop_raises(self, plan_tools):
-        from src.tools.plan_tools import PlanValidationError
-
         tasks = [make_task("a", depends_on=["a"])]
         with pytest.raises(PlanValidationError):
             await plan_tools.create(make_create_req("selfloop", tasks))
 
     @pytest.mark.asyncio
     async def test_create_unknown_dependency_raises(self, plan_tools):
-        from src.tools.plan_tools import PlanValidationError
-
         tasks = [make_task("a", depends_on=["nonexistent"])]
         with pytest.raises(PlanValidationError, match="unknown task"):
             await plan_tools.create(make_create_req("missing_dep", tasks))
 
     @pytest.mark.asyncio
     async def test_create_duplicate_task_ids_raises(self, plan_tools):
-        from src.tools.plan_tools import PlanValidationError
-
         tasks = [make_task("a"), make_task("a")]
         with pytest.raises(PlanValidationError, match="Duplicate"):
             await plan_tools.create(make_create_req("dup", tasks))
 
     @pytest.mark.asyncio
     async def test_create_invalid_on_failure_raises(self, plan_tools):
-        from src.tools.plan_tools import PlanValidationError
-
         tasks = [make_task("a")]
         req = make_create_req("bad_policy", tasks, on_failure="invalid_policy")
         with pytest.raises(PlanValidationError, match="Invalid on_failure"):
             await plan_tools.create(req)
 
     @pytest.mark.asyncio
-    async def test_create_persists_to_db(self, plan_tools, plan_db):
+    async def test_create_persists_to_db(self, plan_tools, plan_db_reader):
         """Created plan and tasks should be in the DB."""
         req = make_create_req("persist", [make_task("p1"), make_task("p2", depends_on=["p1"])])
         result = await plan_tools.create(req)
 
-        conn = plan_db.connection
-        cur = await conn.execute("SELECT * FROM plan_plans WHERE id = ?", (result.plan_id,))
-        plan_row = await cur.fetchone()
-        assert plan_row is not None
+        rows = plan_db_reader.execute(
+            "SELECT name, status, (SELECT COUNT(*) FROM plan_tasks WHERE plan_id = p.id) AS cnt "
+            "FROM plan_plans p WHERE p.id = ?",
+            (result.plan_id,),
+        ).fetchall()
+        assert len(rows) == 1
+        plan_row = rows[0]
         assert plan_row["name"] == "persist"
         assert plan_row["status"] == "pending"
-
-        cur = await conn.execute("SELECT COUNT(*) as cnt FROM plan_tasks WHERE plan_id = ?", (result.plan_id,))
-        count = (await cur.fetchone())["cnt"]
-        assert count == 2
+        assert plan_row["cnt"] == 2
 
 
 # ---------------------------------------------------------------------------
@@ -224,7 +340,7 @@ class TestPlanExecuteSuccess:
     """Tests for plan_execute — success scenarios."""
 
     @pytest.mark.asyncio
-    async def test_execute_single_task(self, plan_db):
+    async def test_execute_single_task(self, plan_harness):
         """Single task plan should complete and record output."""
         call_log = []
 
@@ -232,17 +348,12 @@ class TestPlanExecuteSuccess:
             call_log.append((category, name, params))
             return {"result": "hello"}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
 
         create_req = make_create_req("single_exec", [make_task("t1", tool_cat="shell", tool_name="execute")])
         created = await pt.create(create_req)
 
-        from src.models import PlanExecuteRequest
-
         result = await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
 
         assert result.status == "completed"
@@ -253,7 +364,7 @@ class TestPlanExecuteSuccess:
         assert call_log[0] == ("shell", "execute", {})
 
     @pytest.mark.asyncio
-    async def test_execute_sequential_chain_order(self, plan_db):
+    async def test_execute_sequential_chain_order(self, plan_harness):
         """Tasks in a chain must execute in dependency order."""
         call_order = []
 
@@ -261,11 +372,8 @@ class TestPlanExecuteSuccess:
             call_order.append(name)
             return {"step": name}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
 
         tasks = [
             make_task("s1", tool_name="step1"),
@@ -274,8 +382,6 @@ class TestPlanExecuteSuccess:
         ]
         created = await pt.create(make_create_req("chain_exec", tasks))
 
-        from src.models import PlanExecuteRequest
-
         result = await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
 
         assert result.status == "completed"
@@ -283,7 +389,7 @@ class TestPlanExecuteSuccess:
         assert call_order == ["step1", "step2", "step3"]
 
     @pytest.mark.asyncio
-    async def test_execute_parallel_branches_run_concurrently(self, plan_db):
+    async def test_execute_parallel_branches_run_concurrently(self, plan_harness):
         """Tasks in same level should all be dispatched (concurrent via gather)."""
         called = []
 
@@ -291,11 +397,8 @@ class TestPlanExecuteSuccess:
             called.append(name)
             return {"done": name}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
 
         tasks = [
             make_task("root", tool_name="root"),
@@ -305,8 +408,6 @@ class TestPlanExecuteSuccess:
         ]
         created = await pt.create(make_create_req("parallel_exec", tasks))
 
-        from src.models import PlanExecuteRequest
-
         result = await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
 
         assert result.status == "completed"
@@ -318,7 +419,66 @@ class TestPlanExecuteSuccess:
         assert called[-1] == "end"
 
     @pytest.mark.asyncio
-    async def test_execute_task_ref_resolution(self, plan_db):
+    async def test_execute_starts_tasks_when_dependencies_finish(self, plan_harness):
+        """A dependent starts as soon as its own dependencies finish, not its whole level."""
+        follow_up_started = asyncio.Event()
+
+        async def dispatch(category, name, params):
+            if name == "slow":
+                # Only returns once fast's dependent is already running
+                await follow_up_started.wait()
+            elif name == "follow_up":
+                follow_up_started.set()
+            return {"done": name}
+
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
+
+        tasks = [
+            make_task("slow", tool_name="slow"),
+            make_task("fast", tool_name="fast"),
+            make_task("follow_up", tool_name="follow_up", depends_on=["fast"]),
+        ]
+        created = await pt.create(make_create_req("ready_queue", tasks))
+
+        result = await asyncio.wait_for(
+            pt.execute(PlanExecuteRequest(plan_id=created.plan_id)), timeout=5
+        )
+
+        assert result.status == "completed"
+        assert result.tasks_completed == 3
+
+    @pytest.mark.asyncio
+    async def test_execute_cancelled_waits_for_running_tasks(self, plan_harness):
+        """Cancelling execute() lets running tasks unwind before it returns."""
+        started = asyncio.Event()
+        unwound = []
+
+        async def dispatch(category, name, params):
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            finally:
+                # Cleanup that takes a few loop turns, like a task-status write
+                await asyncio.sleep(0.05)
+                unwound.append(name)
+
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
+
+        created = await pt.create(make_create_req("cancel_running", [make_task("hang", tool_name="hang")]))
+        run = asyncio.create_task(pt.execute(PlanExecuteRequest(plan_id=created.plan_id)))
+        await asyncio.wait_for(started.wait(), timeout=5)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+
+        assert unwound == ["hang"]
+        status = await pt.status(PlanStatusRequest(plan_id=created.plan_id))
+        assert status.status == "cancelled"
+
+    @pytest.mark.asyncio
+    async def test_execute_task_ref_resolution(self, plan_harness):
         """{{task:ID.field}} in params should be resolved before dispatch."""
         dispatched_params = []
 
@@ -326,11 +486,8 @@ class TestPlanExecuteSuccess:
             dispatched_params.append(params)
             return {"output_value": "resolved_data"}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
 
         tasks = [
             make_task("producer", tool_name="first", params={}),
@@ -338,8 +495,6 @@ class TestPlanExecuteSuccess:
         ]
         created = await pt.create(make_create_req("ref_resolve", tasks))
 
-        from src.models import PlanExecuteRequest
-
         result = await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
 
         assert result.status == "completed"
@@ -348,18 +503,13 @@ class TestPlanExecuteSuccess:
         assert consumer_params["input"] == "resolved_data"
 
     @pytest.mark.asyncio
-    async def test_execute_resolves_unique_plan_name_reference(self, plan_db):
+    async def test_execute_resolves_unique_plan_name_reference(self, plan_harness):
         """If plan_id is a unique plan name, execute should resolve it."""
         async def dispatch(category, name, params):
             return {"ok": True}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
-
-        from src.models import PlanExecuteRequest
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
 
         created = await pt.create(make_create_req("plan_name_ref", [make_task("t1")]))
         result = await pt.execute(PlanExecuteRequest(plan_id="plan_name_ref"))
@@ -368,18 +518,13 @@ class TestPlanExecuteSuccess:
         assert result.plan_id == created.plan_id
 
     @pytest.mark.asyncio
-    async def test_execute_waits_briefly_for_concurrent_plan_create_by_name(self, plan_db):
+    async def test_execute_waits_briefly_for_concurrent_plan_create_by_name(self, plan_harness):
         """If execute races create, a brief retry window should resolve by name."""
         async def dispatch(category, name, params):
             return {"ok": True}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
-
-        from src.models import PlanExecuteRequest
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
 
         async def delayed_create():
             await asyncio.sleep(0.15)
@@ -401,118 +546,57 @@ class TestPlanExecuteSuccess:
 class TestPlanExecuteFailurePolicies:
     """Tests for plan_execute — failure policy handling."""
 
+    @pytest.mark.parametrize(
+        "policy,expected",
+        [
+            # stop: no task starts after the failure, even unrelated ones;
+            # tasks already running (independent) still finish
+            ("stop", {"fail_me": "failed", "independent": "completed", "after": "skipped", "after_ok": "skipped"}),
+            # skip_dependents: only tasks downstream of the failure are skipped
+            ("skip_dependents", {"fail_me": "failed", "independent": "completed", "after": "skipped", "after_ok": "completed"}),
+            # continue: every task runs regardless of failures
+            ("continue", {"fail_me": "failed", "independent": "completed", "after": "completed", "after_ok": "completed"}),
+        ],
+    )
     @pytest.mark.asyncio
-    async def test_failure_stop_policy(self, plan_db):
-        """When on_failure=stop, failure of one task stops remaining tasks."""
-        call_count = [0]
-
-        async def dispatch(category, name, params):
-            call_count[0] += 1
-            if name == "fail_me":
-                raise RuntimeError("Simulated failure")
-            return {"ok": True}
-
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
-
-        # fail_me and ok_task at same level; after_fail depends on both
-        tasks = [
-            make_task("fail_me", tool_name="fail_me"),
-            make_task("ok_task", tool_name="ok_task"),
-            make_task("after_fail", tool_name="after_fail", depends_on=["fail_me", "ok_task"]),
-        ]
-        created = await pt.create(make_create_req("stop_policy", tasks, on_failure="stop"))
-
-        from src.models import PlanExecuteRequest, PlanStatusRequest
-
-        result = await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
-        status = await pt.status(PlanStatusRequest(plan_id=created.plan_id))
-
-        assert result.status == "failed"
-        assert result.tasks_failed >= 1
-        assert result.tasks_skipped >= 1
-
-        # after_fail should be skipped
-        task_statuses = {t.id: t.status for t in status.tasks}
-        assert task_statuses["fail_me"] == "failed"
-        assert task_statuses["after_fail"] == "skipped"
-
-    @pytest.mark.asyncio
-    async def test_failure_skip_dependents_policy(self, plan_db):
-        """skip_dependents: only skip tasks that depend on the failed task."""
+    async def test_failure_policy(self, plan_harness, policy, expected):
+        """Plan-level on_failure decides which tasks still run after a failure."""
         called = []
+        failed = asyncio.Event()
 
         async def dispatch(category, name, params):
             called.append(name)
             if name == "fail_me":
-                raise RuntimeError("fail")
+                failed.set()
+                raise RuntimeError("Simulated failure")
+            if name == "independent":
+                # Finish no earlier than the failure, so "stop" has fired
+                # before after_ok would become ready
+                await failed.wait()
             return {"ok": True}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
 
-        # fail_me and independent at same level; dep_on_fail depends only on fail_me
+        # fail_me and independent share level 0; after/after_ok each depend on one of them
         tasks = [
             make_task("fail_me", tool_name="fail_me"),
             make_task("independent", tool_name="independent"),
-            make_task("dep_on_fail", tool_name="dep_on_fail", depends_on=["fail_me"]),
-        ]
-        created = await pt.create(make_create_req("skip_deps", tasks, on_failure="skip_dependents"))
-
-        from src.models import PlanExecuteRequest, PlanStatusRequest
-
-        result = await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
-        status = await pt.status(PlanStatusRequest(plan_id=created.plan_id))
-
-        task_statuses = {t.id: t.status for t in status.tasks}
-        assert task_statuses["fail_me"] == "failed"
-        assert task_statuses["dep_on_fail"] == "skipped"
-        # independent task should still run and complete
-        assert task_statuses["independent"] == "completed"
-        assert "independent" in called
-
-    @pytest.mark.asyncio
-    async def test_failure_continue_policy(self, plan_db):
-        """continue policy: all tasks run regardless of failures."""
-        called = []
-
-        async def dispatch(category, name, params):
-            called.append(name)
-            if name == "fail_me":
-                raise RuntimeError("fail")
-            return {"ok": True}
-
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
-
-        tasks = [
-            make_task("fail_me", tool_name="fail_me"),
-            make_task("after_fail", tool_name="after_fail", depends_on=["fail_me"]),
+            make_task("after", tool_name="after", depends_on=["fail_me"]),
+            make_task("after_ok", tool_name="after_ok", depends_on=["independent"]),
         ]
-        created = await pt.create(make_create_req("continue_policy", tasks, on_failure="continue"))
-
-        from src.models import PlanExecuteRequest, PlanStatusRequest
+        created = await pt.create(make_create_req(f"{policy}_policy", tasks, on_failure=policy))
 
         result = await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
         status = await pt.status(PlanStatusRequest(plan_id=created.plan_id))
 
-        task_statuses = {t.id: t.status for t in status.tasks}
-        assert task_statuses["fail_me"] == "failed"
-        # after_fail should run (continue policy)
-        assert task_statuses["after_fail"] == "completed"
-        assert "after_fail" in called
+        assert result.status == "failed"
+        assert result.tasks_failed == 1
+        assert {t.id: t.status for t in status.tasks} == expected
+        assert sorted(called) == sorted(tid for tid, st in expected.items() if st != "skipped")
 
     @pytest.mark.asyncio
-    async def test_per_task_on_failure_override(self, plan_db):
+    async def test_per_task_on_failure_override(self, plan_harness):
         """Per-task on_failure overrides plan-level policy."""
         called = []
 
@@ -522,11 +606,8 @@ class TestPlanExecuteFailurePolicies:
                 raise RuntimeError("fail")
             return {"ok": True}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
 
         # Plan is stop, but fail_me has continue override
         tasks = [
@@ -535,8 +616,6 @@ class TestPlanExecuteFailurePolicies:
         ]
         created = await pt.create(make_create_req("per_task_override", tasks, on_failure="stop"))
 
-        from src.models import PlanExecuteRequest, PlanStatusRequest
-
         result = await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
         status = await pt.status(PlanStatusRequest(plan_id=created.plan_id))
 
@@ -553,17 +632,12 @@ class TestPlanExecuteFailurePolicies:
 class TestPlanExecuteNotFound:
     @pytest.mark.asyncio
     async def test_execute_nonexistent_plan(self, plan_tools):
-        from src.models import PlanExecuteRequest
-        from src.tools.plan_tools import PlanNotFoundError
-
         with pytest.raises(PlanNotFoundError):
             await plan_tools.execute(PlanExecuteRequest(plan_id="does-not-exist"))
 
     @pytest.mark.asyncio
     async def test_execute_plan_name_ambiguous_raises_value_error(self, plan_tools):
         """Name fallback should fail when multiple plans share the same name."""
-        from src.models import PlanExecuteRequest
-
         await plan_tools.create(make_create_req("duplicate_name", [make_task("a1")]))
         await plan_tools.create(make_create_req("duplicate_name", [make_task("a2")]))
 
@@ -571,18 +645,13 @@ class TestPlanExecuteNotFound:
             await plan_tools.execute(PlanExecuteRequest(plan_id="duplicate_name"))
 
     @pytest.mark.asyncio
-    async def test_execute_already_completed(self, plan_db):
+    async def test_execute_already_completed(self, plan_harness):
         """Re-executing a completed plan should raise ValueError."""
         async def dispatch(category, name, params):
             return {"ok": True}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
-
-        from src.models import PlanExecuteRequest
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
 
         created = await pt.create(make_create_req("rerun", [make_task("t1")]))
         await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
@@ -599,8 +668,6 @@ class TestPlanExecuteNotFound:
 class TestPlanStatus:
     @pytest.mark.asyncio
     async def test_status_pending_plan(self, plan_tools):
-        from src.models import PlanStatusRequest
-
         created = await plan_tools.create(make_create_req("pending", [make_task("x1"), make_task("x2")]))
         status = await plan_tools.status(PlanStatusRequest(plan_id=created.plan_id))
 
@@ -613,17 +680,12 @@ class TestPlanStatus:
         assert status.tasks_running == 0
 
     @pytest.mark.asyncio
-    async def test_status_completed_plan(self, plan_db):
+    async def test_status_completed_plan(self, plan_harness):
         async def dispatch(category, name, params):
             return {"value": 42}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
-
-        from src.models import PlanExecuteRequest, PlanStatusRequest
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
 
         created = await pt.create(make_create_req("done", [make_task("q1"), make_task("q2", depends_on=["q1"])]))
         await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
@@ -639,17 +701,37 @@ class TestPlanStatus:
         assert task_map["q1"].status == "completed"
 
     @pytest.mark.asyncio
-    async def test_status_task_timestamps(self, plan_db):
+    async def test_status_output_not_recorded(self, plan_harness):
+        """With record_output=False outputs stay in memory for refs but are not persisted."""
+        dispatched_params = []
+
+        async def dispatch(category, name, params):
+            dispatched_params.append(params)
+            return {"value": 42}
+
+        plan_harness.set_dispatch(dispatch)
+        plan_harness.set_record_output(False)
+        pt = plan_harness.tools
+
+        tasks = [
+            make_task("n1"),
+            make_task("n2", params={"input": "{{task:n1.value}}"}, depends_on=["n1"]),
+        ]
+        created = await pt.create(make_create_req("unrecorded", tasks))
+        await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
+        status = await pt.status(PlanStatusRequest(plan_id=created.plan_id))
+
+        assert status.status == "completed"
+        assert dispatched_params[1] == {"input": 42}
+        assert all(t.output is None for t in status.tasks)
+
+    @pytest.mark.asyncio
+    async def test_status_task_timestamps(self, plan_harness):
         async def dispatch(category, name, params):
             return {}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
-
-        from src.models import PlanExecuteRequest, PlanStatusRequest
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
 
         created = await pt.create(make_create_req("timestamps", [make_task("ts1")]))
         await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
@@ -663,9 +745,6 @@ class TestPlanStatus:
 
     @pytest.mark.asyncio
     async def test_status_not_found(self, plan_tools):
-        from src.models import PlanStatusRequest
-        from src.tools.plan_tools import PlanNotFoundError
-
         with pytest.raises(PlanNotFoundError):
             await plan_tools.status(PlanStatusRequest(plan_id="no-such-plan"))
 
@@ -676,6 +755,11 @@ class TestPlanStatus:
 
 
 class TestPlanList:
+    @pytest.fixture(autouse=True)
+    def _skip_output_recording(self, plan_harness):
+        """Nothing here reads task output, so don't persist it."""
+        plan_harness.set_record_output(False)
+
     @pytest.mark.asyncio
     async def test_list_empty(self, plan_tools):
         result = await plan_tools.list()
@@ -699,17 +783,12 @@ class TestPlanList:
         assert task_counts["beta"] == 2
 
     @pytest.mark.asyncio
-    async def test_list_shows_status(self, plan_db):
+    async def test_list_shows_status(self, plan_harness):
         async def dispatch(category, name, params):
             return {}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
-
-        from src.models import PlanExecuteRequest
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
 
         created = await pt.create(make_create_req("finished", [make_task("f1")]))
         await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
@@ -725,10 +804,13 @@ class TestPlanList:
 
 
 class TestPlanCancel:
+    @pytest.fixture(autouse=True)
+    def _skip_output_recording(self, plan_harness):
+        """Nothing here reads task output, so don't persist it."""
+        plan_harness.set_record_output(False)
+
     @pytest.mark.asyncio
     async def test_cancel_pending_plan(self, plan_tools):
-        from src.models import PlanCancelRequest, PlanStatusRequest
-
         created = await plan_tools.create(make_create_req("to_cancel", [make_task("c1"), make_task("c2")]))
         cancel_result = await plan_tools.cancel(PlanCancelRequest(plan_id=created.plan_id))
 
@@ -740,8 +822,6 @@ class TestPlanCancel:
 
     @pytest.mark.asyncio
     async def test_cancel_already_cancelled_raises(self, plan_tools):
-        from src.models import PlanCancelRequest
-
         created = await plan_tools.create(make_create_req("cancel2", [make_task("d1")]))
         await plan_tools.cancel(PlanCancelRequest(plan_id=created.plan_id))
 
@@ -749,17 +829,12 @@ class TestPlanCancel:
             await plan_tools.cancel(PlanCancelRequest(plan_id=created.plan_id))
 
     @pytest.mark.asyncio
-    async def test_cancel_completed_plan_raises(self, plan_db):
+    async def test_cancel_completed_plan_raises(self, plan_harness):
         async def dispatch(category, name, params):
             return {}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
-
-        from src.models import PlanCancelRequest, PlanExecuteRequest
+        plan_harness.set_dispatch(dispatch)
+        pt = plan_harness.tools
 
         created = await pt.create(make_create_req("done_cancel", [make_task("e1")]))
         await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
@@ -769,9 +844,6 @@ class TestPlanCancel:
 
     @pytest.mark.asyncio
     async def test_cancel_not_found(self, plan_tools):
-        from src.models import PlanCancelRequest
-        from src.tools.plan_tools import PlanNotFoundError
-
         with pytest.raises(PlanNotFoundError):
             await plan_tools.cancel(PlanCancelRequest(plan_id="ghost-plan"))
 
@@ -785,7 +857,7 @@ class TestPlanHITL:
     """Tests for HITL integration within plan tasks."""
 
     @pytest.mark.asyncio
-    async def test_hitl_approved_task_runs(self, plan_db):
+    async def test_hitl_approved_task_runs(self, plan_harness):
         """Tasks with require_hitl=True run when HITL approves."""
         called = []
 
@@ -793,21 +865,11 @@ class TestPlanHITL:
             called.append(name)
             return {"done": True}
 
-        # Mock HITL that approves
-        mock_hitl_req = MagicMock()
-        mock_hitl_req.id = "hitl-req-1"
-
-        mock_hitl = MagicMock()
-        mock_hitl.create_request = AsyncMock(return_value=mock_hitl_req)
-        mock_hitl.wait_for_decision = AsyncMock(return_value="approved")
+        hitl = _FakeHitl("approved")
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch, hitl=mock_hitl)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
-
-        from src.models import PlanExecuteRequest
+        plan_harness.set_dispatch(dispatch)
+        plan_harness.set_hitl(hitl)
+        pt = plan_harness.tools
 
         created = await pt.create(make_create_req("hitl_approved", [make_task("h1", require_hitl=True)]))
         result = await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
@@ -816,29 +878,20 @@ class TestPlanHITL:
         assert result.tasks_completed == 1
         assert "read" in called  # default tool_name
 
-        mock_hitl.create_request.assert_called_once()
-        mock_hitl.wait_for_decision.assert_called_once_with("hitl-req-1")
+        assert len(hitl.created) == 1
+        assert hitl.waited == ["hitl-req-1"]
 
     @pytest.mark.asyncio
-    async def test_hitl_rejected_task_fails(self, plan_db):
+    async def test_hitl_rejected_task_fails(self, plan_harness):
         """Tasks with require_hitl=True fail when HITL rejects."""
-        mock_hitl_req = MagicMock()
-        mock_hitl_req.id = "hitl-req-2"
-
-        mock_hitl = MagicMock()
-        mock_hitl.create_request = AsyncMock(return_value=mock_hitl_req)
-        mock_hitl.wait_for_decision = AsyncMock(return_value="rejected")
+        hitl = _FakeHitl("rejected")
 
         async def dispatch(category, name, params):
             return {}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch, hitl=mock_hitl)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
-
-        from src.models import PlanExecuteRequest, PlanStatusRequest
+        plan_harness.set_dispatch(dispatch)
+        plan_harness.set_hitl(hitl)
+        pt = plan_harness.tools
 
         created = await pt.create(make_create_req("hitl_rejected", [make_task("h2", require_hitl=True)]))
         result = await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
@@ -850,25 +903,16 @@ class TestPlanHITL:
         assert status.tasks[0].error == "Task rejected via HITL"
 
     @pytest.mark.asyncio
-    async def test_hitl_expired_task_fails(self, plan_db):
+    async def test_hitl_expired_task_fails(self, plan_harness):
         """Tasks with require_hitl=True fail when HITL expires."""
-        mock_hitl_req = MagicMock()
-        mock_hitl_req.id = "hitl-req-3"
-
-        mock_hitl = MagicMock()
-        mock_hitl.create_request = AsyncMock(return_value=mock_hitl_req)
-        mock_hitl.wait_for_decision = AsyncMock(return_value="expired")
+        hitl = _FakeHitl("expired")
 
         async def dispatch(category, name, params):
             return {}
 
-        pt = _make_plan_tools(plan_db, dispatch=dispatch, hitl=mock_hitl)
-        conn = plan_db.connection
-        await conn.execute("DELETE FROM plan_tasks")
-        await conn.execute("DELETE FROM plan_plans")
-        await conn.commit()
-
-        from src.models import PlanExecuteRequest, PlanStatusRequest
+        plan_harness.set_dispatch(dispatch)
+        plan_harness.set_hitl(hitl)
+        pt = plan_harness.tools
 
         created = await pt.create(make_create_req("hitl_expired", [make_task("h3", require_hitl=True)]))
         result = await pt.execute(PlanExecuteRequest(plan_id=created.plan_id))
@@ -887,8 +931,6 @@ class TestHelperFunctions:
     """Unit tests for standalone helper functions."""
 
     def test_compute_execution_levels_linear(self):
-        from src.tools.plan_tools import _compute_execution_levels
-
         tasks = [
             {"id": "a", "depends_on": []},
             {"id": "b", "depends_on": ["a"]},
@@ -898,8 +940,6 @@ class TestHelperFunctions:
         assert levels == [["a"], ["b"], ["c"]]
 
     def test_compute_execution_levels_parallel(self):
-        from src.tools.plan_tools import _compute_execution_levels
-
         tasks = [
             {"id": "root", "depends_on": []},
             {"id": "x", "depends_on": ["root"]},
@@ -910,8 +950,6 @@ class TestHelperFunctions:
         assert sorted(levels[1]) == ["x", "y"]
 
     def test_compute_execution_levels_detects_cycle(self):
-        from src.tools.plan_tools import PlanValidationError, _compute_execution_levels
-
         tasks = [
             {"id": "a", "depends_on": ["b"]},
             {"id": "b", "depends_on": ["a"]},
@@ -920,20 +958,16 @@ class TestHelperFunctions:
             _compute_execution_levels(tasks)
 
     def test_compute_execution_levels_detects_missing_dep(self):
-        from src.tools.plan_tools import PlanValidationError, _compute_execution_levels
-
         tasks = [{"id": "a", "depends_on": ["ghost"]}]
         with pytest.raises(PlanValidationError, match="unknown task"):
             _compute_execution_levels(tasks)
 
     def test_get_transitive_dependents(self):
-        from src.tools.plan_tools import _get_transitive_dependents
-
         tasks = [
-            {"id": "a", "depends_on": "[]"},
-            {"id": "b", "depends_on": '["a"]'},
-            {"id": "c", "depends_on": '["b"]'},
-            {"id": "d", "depends_on": "[]"},  # unrelated
+            {"id": "a", "depends_on": []},
+            {"id": "b", "depends_on": ["a"]},
+            {"id": "c", "depends_on": ["b"]},
+            {"id": "d", "depends_on": []},  # unrelated
         ]
         deps = _get_transitive_dependents("a", tasks)
         assert "b" in deps
@@ -942,23 +976,17 @@ class TestHelperFunctions:
         assert "a" not in deps
 
     def test_resolve_task_refs_simple(self):
-        from src.tools.plan_tools import _resolve_task_refs
-
         params = {"input": "{{task:t1.value}}"}
         outputs = {"t1": {"value": "hello"}}
         resolved = _resolve_task_refs(params, outputs)
         assert resolved["input"] == "hello"
 
     def test_resolve_task_refs_missing_task(self):
-        from src.tools.plan_tools import _resolve_task_refs
-
         params = {"input": "{{task:missing.field}}"}
         resolved = _resolve_task_refs(params, {})
         assert resolved["input"] == ""  # defaults to empty string
 
     def test_resolve_task_refs_nested(self):
-        from src.tools.plan_tools import _resolve_task_refs
-
         params = {"a": "{{task:t1.x}}", "b": "{{task:t2.y}}"}
         outputs = {"t1": {"x": "foo"}, "t2": {"y": "bar"}}
         resolved = _resolve_task_refs(params, outputs)
@@ -966,8 +994,6 @@ class TestHelperFunctions:
         assert resolved["b"] == "bar"
 
     def test_resolve_task_refs_dict_value(self):
-        from src.tools.plan_tools import _resolve_task_refs
-
         params = {"data": "{{task:t1.nested}}"}
         outputs = {"t1": {"nested": {"key": "val"}}}
         resolved = _resolve_task_refs(params, outputs)
@@ -980,12 +1006,15 @@ class TestHelperFunctions:
 # ---------------------------------------------------------------------------
 
 
-def _api_client():
-    """Return a started TestClient context manager."""
-    from fastapi.testclient import TestClient
-    from src.main import app
+@pytest.fixture(scope="module")
+def api_client(app):
+    """A started TestClient shared by the module's API tests.
 
-    return TestClient(app, raise_server_exceptions=False)
+    App startup (lifespan, DB connect) runs once instead of once per test;
+    each test uses its own plan names so they do not interfere.
+    """
+    with TestClient(app, raise_server_exceptions=False) as client:
+        yield client
 
 
 def _api_create_plan(client, name, tasks, on_failure="stop"):
@@ -999,55 +1028,49 @@ def _api_create_plan(client, name, tasks, on_failure="stop"):
 class TestPlanIntegration:
     """Integration tests using FastAPI TestClient via plan endpoints."""
 
-    def test_create_plan_api(self):
+    def test_create_plan_api(self, api_client):
         tasks = [{"id": "t1", "name": "Task 1", "tool_category": "fs", "tool_name": "read", "params": {}, "depends_on": []}]
-        with _api_client() as client:
-            resp = _api_create_plan(client, "api_test", tasks)
+        resp = _api_create_plan(api_client, "api_test", tasks)
         assert resp.status_code == 200
         data = resp.json()
         assert "plan_id" in data
         assert data["task_count"] == 1
         assert data["execution_levels"] == 1
 
-    def test_create_plan_cycle_returns_422(self):
+    def test_create_plan_cycle_returns_422(self, api_client):
         tasks = [
             {"id": "a", "name": "A", "tool_category": "fs", "tool_name": "read", "params": {}, "depends_on": ["b"]},
             {"id": "b", "name": "B", "tool_category": "fs", "tool_name": "read", "params": {}, "depends_on": ["a"]},
         ]
-        with _api_client() as client:
-            resp = _api_create_plan(client, "cycle_api", tasks)
+        resp = _api_create_plan(api_client, "cycle_api", tasks)
         assert resp.status_code == 422
 
-    def test_plan_status_not_found_returns_404(self):
-        with _api_client() as client:
-            resp = client.post("/api/tools/plan/status", json={"plan_id": "nonexistent-id-xyz"})
+    def test_plan_status_not_found_returns_404(self, api_client):
+        resp = api_client.post("/api/tools/plan/status", json={"plan_id": "nonexistent-id-xyz"})
         assert resp.status_code == 404
 
-    def test_plan_list_api(self):
-        with _api_client() as client:
-            resp = client.post("/api/tools/plan/list", json={})
+    def test_plan_list_api(self, api_client):
+        resp = api_client.post("/api/tools/plan/list", json={})
         assert resp.status_code == 200
         data = resp.json()
         assert "plans" in data
         assert "total" in data
 
-    def test_plan_cancel_not_found_returns_404(self):
-        with _api_client() as client:
-            resp = client.post("/api/tools/plan/cancel", json={"plan_id": "nonexistent-id-xyz"})
+    def test_plan_cancel_not_found_returns_404(self, api_client):
+        resp = api_client.post("/api/tools/plan/cancel", json={"plan_id": "nonexistent-id-xyz"})
         assert resp.status_code == 404
 
-    def test_create_then_status_via_api(self):
+    def test_create_then_status_via_api(self, api_client):
         """Create a plan and immediately check status."""
         tasks = [
             {"id": "s1", "name": "Step 1", "tool_category": "fs", "tool_name": "read", "params": {}, "depends_on": []},
             {"id": "s2", "name": "Step 2", "tool_category": "fs", "tool_name": "read", "params": {}, "depends_on": ["s1"]},
         ]
-        with _api_client() as client:
-            create_resp = _api_create_plan(client, "status_check", tasks)
-            assert create_resp.status_code == 200
-            plan_id = create_resp.json()["plan_id"]
+        create_resp = _api_create_plan(api_client, "status_check", tasks)
+        assert create_resp.status_code == 200
+        plan_id = create_resp.json()["plan_id"]
 
-            status_resp = client.post("/api/tools/plan/status", json={"plan_id": plan_id})
+        status_resp = api_client.post("/api/tools/plan/status", json={"plan_id": plan_id})
         assert status_resp.status_code == 200
         data = status_resp.json()
         assert data["plan_id"] == plan_id
@@ -1055,49 +1078,44 @@ class TestPlanIntegration:
         assert data["tasks_total"] == 2
         assert len(data["tasks"]) == 2
 
-    def test_execute_by_unique_plan_name_via_api(self):
+    def test_execute_by_unique_plan_name_via_api(self, api_client):
         """Execute endpoint should resolve unique plan names and return canonical plan_id."""
         tasks = [{"id": "e1", "name": "E1", "tool_category": "fs", "tool_name": "read", "params": {}, "depends_on": []}]
-        with _api_client() as client:
-            create_resp = _api_create_plan(client, "execute_by_name_api", tasks)
-            assert create_resp.status_code == 200
-            created_plan_id = create_resp.json()["plan_id"]
+        create_resp = _api_create_plan(api_client, "execute_by_name_api", tasks)
+        assert create_resp.status_code == 200
+        created_plan_id = create_resp.json()["plan_id"]
 
-            exec_resp = client.post("/api/tools/plan/execute", json={"plan_id": "execute_by_name_api"})
+        exec_resp = api_client.post("/api/tools/plan/execute", json={"plan_id": "execute_by_name_api"})
         assert exec_resp.status_code == 200
         data = exec_resp.json()
         assert data["plan_id"] == created_plan_id
         assert data["status"] in ("completed", "failed")
 
-    def test_create_then_cancel_via_api(self):
+    def test_create_then_cancel_via_api(self, api_client):
         """Create a plan and cancel it via API."""
         tasks = [{"id": "c1", "name": "C1", "tool_category": "fs", "tool_name": "read", "params": {}, "depends_on": []}]
-        with _api_client() as client:
-            create_resp = _api_create_plan(client, "cancel_test_api", tasks)
-            assert create_resp.status_code == 200
-            plan_id = create_resp.json()["plan_id"]
+        create_resp = _api_create_plan(api_client, "cancel_test_api", tasks)
+        assert create_resp.status_code == 200
+        plan_id = create_resp.json()["plan_id"]
 
-            cancel_resp = client.post("/api/tools/plan/cancel", json={"plan_id": plan_id})
+        cancel_resp = api_client.post("/api/tools/plan/cancel", json={"plan_id": plan_id})
         assert cancel_resp.status_code == 200
         data = cancel_resp.json()
         assert data["status"] == "cancelled"
         assert data["cancelled_tasks"] == 1
 
-    def test_sub_app_create_endpoint(self):
+    def test_sub_app_create_endpoint(self, api_client):
         """Sub-app endpoint /tools/plan/create should also work."""
         tasks = [{"id": "sub1", "name": "Sub 1", "tool_category": "fs", "tool_name": "read", "params": {}, "depends_on": []}]
-        with _api_client() as client:
-            resp = client.post("/tools/plan/create", json={"name": "sub_app_test", "tasks": tasks})
+        resp = api_client.post("/tools/plan/create", json={"name": "sub_app_test", "tasks": tasks})
         assert resp.status_code == 200
         assert "plan_id" in resp.json()
 
-    def test_sub_app_list_endpoint(self):
-        with _api_client() as client:
-            resp = client.post("/tools/plan/list", json={})
+    def test_sub_app_list_endpoint(self, api_client):
+        resp = api_client.post("/tools/plan/list", json={})
         assert resp.status_code == 200
 
-    def test_sub_app_status_not_found(self):
+    def test_sub_app_status_not_found(self, api_client):
         # Sub-apps don't have exception handlers, so not-found returns 500
-        with _api_client() as client:
-            resp = client.post("/tools/plan/status", json={"plan_id": "ghost-id"})
+        resp = api_client.post("/tools/plan/status", json={"plan_id": "ghost-id"})
         assert resp.status_code in (404, 500)
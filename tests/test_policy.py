@@ -2,7 +2,7 @@
 
 import pytest
 from src.config import Config, ToolPolicyConfig
-from src.policy import PolicyEngine
+from src.policy import PolicyEngine, _first_matching_pattern
 
 
 @pytest.fixture
@@ -122,3 +122,16 @@ class TestPolicyEvaluation:
         )
         # Should not match any patterns, use base policy
         assert decision == "allow"
+    
+    def test_patterns_updated_after_first_evaluation(self, config, policy_engine):
+        """Test pattern edits take effect after the first evaluation."""
+        decision, _ = policy_engine.evaluate("fs", "write", {"path": "app.log"})
+        assert decision == "allow"
+        
+        config.tools.fs["write"].block_patterns.append("*.log")
+        decision, _ = policy_engine.evaluate("fs", "write", {"path": "app.log"})
+        assert decision == "block"
+    
+    def test_first_matching_pattern_empty_list(self):
+        """Test that no patterns means no match, not a match-everything regex."""
+        assert _first_matching_pattern("anything.exe", []) is None
@@ -21,6 +21,18 @@ def make_secrets_file(content: str) -> str:
     return tmp.name
 
 
+@pytest.fixture(scope="class")
+def sm(request, tmp_path_factory):
+    """SecretManager over the requesting class's ``secrets_env`` content.
+
+    The tests using it only read from the manager, so the file is written
+    and parsed once per class.
+    """
+    f = tmp_path_factory.mktemp("secrets") / "secrets.env"
+    f.write_text(request.cls.secrets_env)
+    return SecretManager(str(f))
+
+
 # ---------------------------------------------------------------------------
 # Loading tests
 # ---------------------------------------------------------------------------
@@ -67,6 +79,15 @@ class TestSecretManagerLoading:
         resolved = sm.resolve_value("{{secret:CONN}}")
         assert resolved == "host=localhost;port=5432"
 
+    def test_malformed_and_indented_lines(self, tmp_path):
+        """Lines without '=' are skipped and '#' inside a value is not a comment."""
+        f = tmp_path / "secrets.env"
+        f.write_text('  # indented comment\nNOT_A_PAIR\n  PASS = "p#ss word"  \nURL=a#b\n')
+        sm = SecretManager(str(f))
+        assert sm.list_keys() == ["PASS", "URL"]
+        assert sm.resolve_value("{{secret:PASS}}") == "p#ss word"
+        assert sm.resolve_value("{{secret:URL}}") == "a#b"
+
     def test_missing_file_is_silent(self, tmp_path):
         """A missing file produces 0 secrets (no exception)."""
         sm = SecretManager(str(tmp_path / "nonexistent.env"))
@@ -92,11 +113,7 @@ class TestSecretManagerLoading:
 class TestSecretTemplateResolution:
     """Tests for {{secret:KEY}} template resolution."""
 
-    @pytest.fixture
-    def sm(self, tmp_path):
-        f = tmp_path / "secrets.env"
-        f.write_text("TOKEN=mytoken\nPASS=s3cr3t\n")
-        return SecretManager(str(f))
+    secrets_env = "TOKEN=mytoken\nPASS=s3cr3t\n"
 
     def test_resolve_simple_template(self, sm):
         """Single template in a string resolves correctly."""
@@ -143,6 +160,14 @@ class TestSecretTemplateResolution:
         # Original must still have the template string
         assert params["Authorization"] == "Bearer {{secret:TOKEN}}"
 
+    def test_resolve_params_preserves_nested_originals(self, sm):
+        """Nested dicts and lists in the result are new objects, not the originals."""
+        params = {"headers": {"X-Pass": "{{secret:PASS}}"}, "values": ["{{secret:TOKEN}}"]}
+        result = sm.resolve_params(params)
+        assert result["headers"] is not params["headers"]
+        assert result["values"] is not params["values"]
+        assert params == {"headers": {"X-Pass": "{{secret:PASS}}"}, "values": ["{{secret:TOKEN}}"]}
+
     def test_has_templates_true(self, sm):
         """has_templates returns True when templates are present."""
         assert sm.has_templates({"key": "{{secret:TOKEN}}"}) is True
@@ -151,6 +176,15 @@ class TestSecretTemplateResolution:
         """has_templates returns False when no templates present."""
         assert sm.has_templates({"key": "plain"}) is False
 
+    def test_has_templates_ignores_marker_in_keys(self, sm):
+        """A template-looking key is not a template; only values count."""
+        assert sm.has_templates({"{{secret:TOKEN}}": "plain"}) is False
+
+    def test_resolve_params_without_templates_returns_input(self, sm):
+        """Params with no templates are returned as-is without a walk."""
+        params = {"headers": {"X-Plain": "value"}, "count": 3}
+        assert sm.resolve_params(params) is params
+
 
 # ---------------------------------------------------------------------------
 # Masking tests
@@ -159,11 +193,7 @@ class TestSecretTemplateResolution:
 class TestSecretMasking:
     """Tests for secret value masking in logs/errors."""
 
-    @pytest.fixture
-    def sm(self, tmp_path):
-        f = tmp_path / "secrets.env"
-        f.write_text("TOKEN=supersecret\nPASS=hunter2\n")
-        return SecretManager(str(f))
+    secrets_env = "TOKEN=supersecret\nPASS=hunter2\n"
 
     def test_mask_value_replaces_secret(self, sm):
         """Literal secret values in text are replaced with [REDACTED]."""
@@ -195,3 +225,67 @@ class TestSecretMasking:
         params = {"token": "supersecret"}
         sm.mask_params(params)
         assert params["token"] == "supersecret"
+
+    def test_mask_value_prefers_longest_secret(self, tmp_path):
+        """A secret that contains another secret is masked as a whole."""
+        f = tmp_path / "secrets.env"
+        f.write_text("SHORT=abc\nLONG=abcdef\n")
+        sm = SecretManager(str(f))
+        assert sm.mask_value("x abcdef y abc") == "x [REDACTED] y [REDACTED]"
+
+
+@pytest.fixture(params=["regex", "automaton"])
+def make_masker(request, monkeypatch, tmp_path):
+    """Build a SecretManager on the regex fallback or the Aho-Corasick path."""
+    import src.secrets
+
+    if request.param == "automaton":
+        pytest.importorskip("ahocorasick")
+    else:
+        monkeypatch.setattr(src.secrets, "AHOCORASICK_AVAILABLE", False)
+
+    def make(secrets_env: str) -> SecretManager:
+        f = tmp_path / "secrets.env"
+        f.write_text(secrets_env)
+        sm = SecretManager(str(f))
+        assert (sm._mask_automaton is not None) == (request.param == "automaton")
+        return sm
+
+    return make
+
+
+class TestSecretMaskingBackends:
+    """The regex fallback and the Aho-Corasick path must redact identically."""
+
+    @pytest.mark.parametrize("secrets_env, text, expected", [
+        # Overlapping secrets are redacted as one span
+        ("A=abc\nB=bcd\n", "x abcd y", "x [REDACTED] y"),
+        # A secret nested inside a longer one
+        ("SHORT=secret\nLONG=mysecretvalue\n", "mysecretvalue secret", "[REDACTED] [REDACTED]"),
+        ("OUTER=abcdef\nINNER=cd\n", "abcdef cd", "[REDACTED] [REDACTED]"),
+        # A match that runs past a longer one it overlaps
+        ("LONG=abcdef\nTAIL=efgh\n", "abcdefgh", "[REDACTED]"),
+        # Adjacent and repeated matches stay separate
+        ("A=ab\nB=cd\n", "abcd ab", "[REDACTED][REDACTED] [REDACTED]"),
+        ("A=aa\n", "aaaaa", "[REDACTED]"),
+    ])
+    def test_overlapping_and_nested_secrets(self, make_masker, secrets_env, text, expected):
+        """Overlapping, nested and adjacent secrets never leave a fragment behind."""
+        assert make_masker(secrets_env).mask_value(text) == expected
+
+    def test_backends_agree(self, monkeypatch, tmp_path):
+        """Both paths give the same output over many random texts."""
+        import random
+        import src.secrets
+
+        pytest.importorskip("ahocorasick")
+        f = tmp_path / "secrets.env"
+        f.write_text("A=ab\nB=bab\nC=abba\nD=b\nE=aab\n")
+        automaton_sm = SecretManager(str(f))
+        monkeypatch.setattr(src.secrets, "AHOCORASICK_AVAILABLE", False)
+        regex_sm = SecretManager(str(f))
+
+        rng = random.Random(0)
+        for _ in range(2000):
+            text = "".join(rng.choice("abx") for _ in range(rng.randint(0, 16)))
+            assert automaton_sm.mask_value(text) == regex_sm.mask_value(text), text
@@ -9,53 +9,68 @@ These tests verify security protections including:
 - Authentication and authorization
 """
 
-import os
-import tempfile
 from unittest.mock import patch
 
 import pytest
+import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
 
-# Set up test environment BEFORE any imports
-TEST_WORKSPACE = tempfile.mkdtemp()
-TEST_DATA_DIR = tempfile.mkdtemp()
 
-# Set environment variables BEFORE importing any src modules
-os.environ["WORKSPACE_BASE_DIR"] = TEST_WORKSPACE
-os.environ["DB_PATH"] = os.path.join(TEST_DATA_DIR, "hostbridge.db")
+@pytest.fixture(scope="module")
+def workspace(tmp_path_factory):
+    """Workspace directory for this module, cleaned up by pytest's tmp handling."""
+    return str(tmp_path_factory.mktemp("security_workspace"))
 
 
-@pytest.fixture
-async def client():
-    """Create test client."""
+@pytest.fixture(scope="module", autouse=True)
+def _env(workspace, tmp_path_factory):
+    """Point the app at this module's DB and workspace; undone when the module finishes."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("WORKSPACE_BASE_DIR", workspace)
+        mp.setenv("DB_PATH", str(tmp_path_factory.mktemp("security_data") / "hostbridge.db"))
+        yield
+
+
+@pytest_asyncio.fixture(scope="module")
+async def client(workspace):
+    """Test client shared by the whole module; the DB is connected once."""
     import src.config
     original_load = src.config.load_config
 
     def patched_load(config_path="config.yaml"):
         cfg = original_load(config_path)
-        cfg.workspace.base_dir = TEST_WORKSPACE
+        cfg.workspace.base_dir = workspace
         return cfg
 
-    src.config.load_config = patched_load
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(src.config, "load_config", patched_load)
 
-    from src.main import app, db
-    await db.connect()
+        from src.main import app, db
+        await db.connect()
 
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        yield ac
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac
 
-    await db.close()
-    src.config.load_config = original_load
+        await db.close()
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(scope="module")
 async def auth_headers(client):
-    """Create authenticated session."""
+    """Create an authenticated session once; tests pass its cookies explicitly."""
     response = await client.post(
         "/admin/api/login",
         json={"password": "admin"}
     )
-    return response.cookies
+    cookies = response.cookies
+    # Keep the shared client unauthenticated unless a test opts in
+    client.cookies.clear()
+    return cookies
+
+
+@pytest.fixture(autouse=True)
+def _reset_client_cookies(client):
+    """Start every test with an empty cookie jar on the shared client."""
+    client.cookies.clear()
 
 
 class TestPathTraversal:
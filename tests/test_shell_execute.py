@@ -1,30 +1,98 @@
 """Tests for shell_execute tool."""
 
-import os
+import asyncio
+import io
+import re
+import tracemalloc
+
 import pytest
 from src.tools.shell_tools import ShellTools
 from src.workspace import WorkspaceManager, SecurityError
 from src.models import ShellExecuteRequest
 
 
-@pytest.fixture
-def workspace_manager(tmp_path):
-    """Create workspace manager with temp directory."""
-    return WorkspaceManager(str(tmp_path))
+@pytest.fixture(scope="module")
+def workspace_root(tmp_path_factory):
+    """Workspace base directory shared by the module's tests."""
+    return tmp_path_factory.mktemp("ws")
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
+def workspace_manager(workspace_root):
+    """Create workspace manager over the shared directory."""
+    return WorkspaceManager(str(workspace_root))
+
+
+@pytest.fixture(scope="module")
 def shell_tools(workspace_manager):
     """Create shell tools instance."""
     return ShellTools(workspace_manager)
 
 
+class _FakeStream:
+    """Just enough of asyncio.StreamReader for ShellTools to drain."""
+
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+
+    async def read(self, n: int = -1) -> bytes:
+        return self._data.read(n)
+
+
+class _FakeProcess:
+    """Finished subprocess with canned output."""
+
+    def __init__(self, stdout: bytes, stderr: bytes, returncode: int):
+        self.stdout = _FakeStream(stdout)
+        self.stderr = _FakeStream(stderr)
+        self.returncode = returncode
+
+    async def wait(self) -> int:
+        return self.returncode
+
+    def kill(self) -> None:
+        pass
+
+
+@pytest.fixture
+def fake_subprocess(monkeypatch):
+    """Replace subprocess creation with a canned result; no fork/exec.
+
+    Call the fixture to set the output; ``.calls`` records exec arguments.
+    """
+    result = {"stdout": b"", "stderr": b"", "returncode": 0}
+    calls = []
+
+    async def create_subprocess_exec(*args, **kwargs):
+        calls.append((args, kwargs))
+        return _FakeProcess(**result)
+
+    def configure(stdout=b"", stderr=b"", returncode=0):
+        result.update(stdout=stdout, stderr=stderr, returncode=returncode)
+
+    configure.calls = calls
+    monkeypatch.setattr(
+        "src.tools.shell_tools.asyncio.create_subprocess_exec", create_subprocess_exec
+    )
+    return configure
+
+
+@pytest.fixture
+def work_dir(workspace_root, request):
+    """Per-test directory inside the shared workspace, so files don't collide."""
+    path = workspace_root / re.sub(r"\W", "_", request.node.name)
+    path.mkdir()
+    return path
+
+
 @pytest.mark.asyncio
-async def test_execute_simple_command(shell_tools, tmp_path):
+async def test_execute_simple_command(shell_tools, fake_subprocess):
     """Test executing a simple command."""
+    fake_subprocess(stdout=b"hello\n")
     request = ShellExecuteRequest(command="echo hello")
     response = await shell_tools.execute(request)
     
+    assert fake_subprocess.calls[0][0] == ("echo", "hello")
     assert response.exit_code == 0
     assert "hello" in response.stdout
     assert response.stderr == ""
@@ -32,10 +100,10 @@ async def test_execute_simple_command(shell_tools, tmp_path):
 
 
 @pytest.mark.asyncio
-async def test_execute_with_working_directory(shell_tools, tmp_path):
+async def test_execute_with_working_directory(shell_tools, work_dir):
     """Test executing command in specific directory."""
     # Create a subdirectory
-    subdir = tmp_path / "subdir"
+    subdir = work_dir / "subdir"
     subdir.mkdir()
     
     request = ShellExecuteRequest(
@@ -50,7 +118,7 @@ async def test_execute_with_working_directory(shell_tools, tmp_path):
 
 
 @pytest.mark.asyncio
-async def test_execute_with_env_vars(shell_tools, tmp_path):
+async def test_execute_with_env_vars(shell_tools):
     """Test executing command with environment variables."""
     # Use sh -c to properly expand variables
     request = ShellExecuteRequest(
@@ -64,10 +132,10 @@ async def test_execute_with_env_vars(shell_tools, tmp_path):
 
 
 @pytest.mark.asyncio
-async def test_execute_command_with_args(shell_tools, tmp_path):
+async def test_execute_command_with_args(shell_tools, work_dir):
     """Test executing command with arguments."""
     # Create a test file
-    test_file = tmp_path / "test.txt"
+    test_file = work_dir / "test.txt"
     test_file.write_text("test content")
     
     request = ShellExecuteRequest(command=f"cat {test_file}")
@@ -78,7 +146,7 @@ async def test_execute_command_with_args(shell_tools, tmp_path):
 
 
 @pytest.mark.asyncio
-async def test_execute_command_with_stderr(shell_tools, tmp_path):
+async def test_execute_command_with_stderr(shell_tools):
     """Test command that produces stderr output."""
     request = ShellExecuteRequest(command="ls /nonexistent 2>&1 || echo error")
     response = await shell_tools.execute(request)
@@ -88,8 +156,26 @@ async def test_execute_command_with_stderr(shell_tools, tmp_path):
 
 
 @pytest.mark.asyncio
-async def test_execute_command_timeout(shell_tools, tmp_path):
-    """Test command timeout."""
+async def test_execute_command_timeout(shell_tools, monkeypatch):
+    """Test that an expired wait is reported as a TimeoutError."""
+    async def expire(awaitable, timeout):
+        awaitable.close()
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr("src.tools.shell_tools.asyncio.wait_for", expire)
+    request = ShellExecuteRequest(
+        command="sleep 10",
+        timeout=1
+    )
+    
+    with pytest.raises(TimeoutError, match="timed out"):
+        await shell_tools.execute(request)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_execute_command_timeout_real_wait(shell_tools):
+    """Test command timeout end to end (waits out the real timeout)."""
     request = ShellExecuteRequest(
         command="sleep 10",
         timeout=1
@@ -100,7 +186,7 @@ async def test_execute_command_timeout(shell_tools, tmp_path):
 
 
 @pytest.mark.asyncio
-async def test_execute_nonexistent_command(shell_tools, tmp_path):
+async def test_execute_nonexistent_command(shell_tools):
     """Test executing nonexistent command."""
     request = ShellExecuteRequest(command="nonexistent_command_xyz")
     
@@ -109,7 +195,7 @@ async def test_execute_nonexistent_command(shell_tools, tmp_path):
 
 
 @pytest.mark.asyncio
-async def test_execute_empty_command(shell_tools, tmp_path):
+async def test_execute_empty_command(shell_tools):
     """Test executing empty command."""
     request = ShellExecuteRequest(command="")
     
@@ -118,11 +204,11 @@ async def test_execute_empty_command(shell_tools, tmp_path):
 
 
 @pytest.mark.asyncio
-async def test_execute_invalid_working_directory(shell_tools, tmp_path):
+async def test_execute_invalid_working_directory(shell_tools, work_dir):
     """Test executing with invalid working directory."""
     request = ShellExecuteRequest(
         command="echo test",
-        workspace_dir=str(tmp_path / "nonexistent")
+        workspace_dir=str(work_dir / "nonexistent")
     )
     
     with pytest.raises((ValueError, SecurityError)):
@@ -147,6 +233,15 @@ async def test_parse_command_with_quotes(shell_tools):
     assert args == ["hello world"]
 
 
+@pytest.mark.asyncio
+async def test_parse_command_mixed_whitespace(shell_tools):
+    """Test that unquoted commands split on any shell whitespace run."""
+    base, args = shell_tools._parse_command("ls\t-la   /tmp\n")
+    
+    assert base == "ls"
+    assert args == ["-la", "/tmp"]
+
+
 @pytest.mark.asyncio
 async def test_check_command_safety_safe(shell_tools):
     """Test safety check for safe commands."""
@@ -154,26 +249,15 @@ async def test_check_command_safety_safe(shell_tools):
     assert is_safe is True
 
 
+@pytest.mark.parametrize("command", [
+    "ls; rm -rf /",
+    "cat file | grep test",
+    "echo test > file.txt",
+])
 @pytest.mark.asyncio
-async def test_check_command_safety_dangerous_metachar(shell_tools):
-    """Test safety check for dangerous metacharacters."""
-    is_safe, reason = shell_tools._check_command_safety("ls; rm -rf /")
-    assert is_safe is False
-    assert "metacharacter" in reason.lower()
-
-
-@pytest.mark.asyncio
-async def test_check_command_safety_pipe(shell_tools):
-    """Test safety check for pipe character."""
-    is_safe, reason = shell_tools._check_command_safety("cat file | grep test")
-    assert is_safe is False
-    assert "metacharacter" in reason.lower()
-
-
-@pytest.mark.asyncio
-async def test_check_command_safety_redirect(shell_tools):
-    """Test safety check for redirection."""
-    is_safe, reason = shell_tools._check_command_safety("echo test > file.txt")
+async def test_check_command_safety_dangerous_metachar(shell_tools, command):
+    """Test safety check for command separators, pipes and redirection."""
+    is_safe, reason = shell_tools._check_command_safety(command)
     assert is_safe is False
     assert "metacharacter" in reason.lower()
 
@@ -186,31 +270,39 @@ async def test_check_command_safety_not_in_allowlist(shell_tools):
     assert "not in allowlist" in reason.lower()
 
 
+@pytest.mark.parametrize("command", [
+    "ls -la",
+    "cat file.txt",
+    "echo hello",
+    "pwd",
+    "git status",
+    "python script.py",
+    "npm install",
+    "docker ps",
+])
 @pytest.mark.asyncio
-async def test_check_command_safety_allowlisted_commands(shell_tools):
+async def test_check_command_safety_allowlisted_commands(shell_tools, command):
     """Test that common commands are in allowlist."""
-    safe_commands = [
-        "ls -la",
-        "cat file.txt",
-        "echo hello",
-        "pwd",
-        "git status",
-        "python script.py",
-        "npm install",
-        "docker ps",
-    ]
+    is_safe, reason = shell_tools._check_command_safety(command)
+    assert is_safe is True, f"Command '{command}' should be safe but got: {reason}"
+
+
+@pytest.mark.asyncio
+async def test_check_command_safety_is_cached(shell_tools):
+    """Test that repeated safety checks reuse the cached verdict."""
+    ShellTools._check_command_safety.cache_clear()
+    first = shell_tools._check_command_safety("git status")
     
-    for cmd in safe_commands:
-        is_safe, reason = shell_tools._check_command_safety(cmd)
-        assert is_safe is True, f"Command '{cmd}' should be safe but got: {reason}"
+    assert shell_tools._check_command_safety("git status") is first
+    assert ShellTools._check_command_safety.cache_info().hits == 1
 
 
 @pytest.mark.asyncio
-async def test_output_truncation(shell_tools, tmp_path):
+async def test_output_truncation(shell_tools, work_dir):
     """Test that large outputs are truncated."""
     # Create a command that produces large output
     large_content = "x" * 150000  # 150KB
-    test_file = tmp_path / "large.txt"
+    test_file = work_dir / "large.txt"
     test_file.write_text(large_content)
     
     request = ShellExecuteRequest(command=f"cat {test_file}")
@@ -222,7 +314,39 @@ async def test_output_truncation(shell_tools, tmp_path):
 
 
 @pytest.mark.asyncio
-async def test_execute_returns_command(shell_tools, tmp_path):
+async def test_output_truncation_keeps_whole_characters(shell_tools, work_dir):
+    """Test that a multibyte character split by the cap is dropped, not garbled."""
+    test_file = work_dir / "multibyte.txt"
+    # The 2-byte "é" straddles the 100000-byte cap
+    test_file.write_text("x" * 99999 + "é" * 10, encoding="utf-8")
+    
+    request = ShellExecuteRequest(command=f"cat {test_file}")
+    response = await shell_tools.execute(request)
+    
+    assert "\ufffd" not in response.stdout
+    assert response.stdout.startswith("x" * 99999 + "\n\n[Output truncated: 100019 bytes total]")
+
+
+@pytest.mark.asyncio
+async def test_output_capture_memory_is_bounded(shell_tools, work_dir):
+    """Test that output past the cap is discarded while reading, not buffered."""
+    test_file = work_dir / "huge.txt"
+    test_file.write_text("x" * 2_000_000)  # 2MB
+    
+    request = ShellExecuteRequest(command=f"cat {test_file}")
+    tracemalloc.start()
+    try:
+        response = await shell_tools.execute(request)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    assert "[Output truncated: 2000000 bytes total]" in response.stdout
+    assert peak < 1_000_000
+
+
+@pytest.mark.asyncio
+async def test_execute_returns_command(shell_tools, fake_subprocess):
     """Test that response includes the executed command."""
     request = ShellExecuteRequest(command="echo test")
     response = await shell_tools.execute(request)
@@ -231,7 +355,7 @@ async def test_execute_returns_command(shell_tools, tmp_path):
 
 
 @pytest.mark.asyncio
-async def test_execute_duration_tracking(shell_tools, tmp_path):
+async def test_execute_duration_tracking(shell_tools, fake_subprocess):
     """Test that execution duration is tracked."""
     request = ShellExecuteRequest(command="echo test")
     response = await shell_tools.execute(request)
@@ -96,6 +96,16 @@ class TestPathResolution:
         with pytest.raises(SecurityError, match="outside base workspace"):
             workspace_manager.resolve_path("test.txt", workspace_override="/tmp")
     
+    def test_block_workspace_override_sibling_with_shared_prefix(self, workspace_manager, temp_workspace):
+        """Test blocking an override whose path merely starts with the base path."""
+        sibling = temp_workspace + "-sibling"
+        os.mkdir(sibling)
+        try:
+            with pytest.raises(SecurityError, match="outside base workspace"):
+                workspace_manager.resolve_path("test.txt", workspace_override=sibling)
+        finally:
+            os.rmdir(sibling)
+    
     def test_resolve_current_directory(self, workspace_manager, temp_workspace):
         """Test resolving current directory (.)."""
         resolved = workspace_manager.resolve_path(".")
@@ -114,6 +124,11 @@ class TestPathResolution:
         outside_path = "/etc/passwd"
         assert not workspace_manager.is_within_workspace(outside_path)
     
+    def test_is_within_workspace_base_and_shared_prefix(self, workspace_manager, temp_workspace):
+        """Test the base itself is within, and a sibling sharing its prefix is not."""
+        assert workspace_manager.is_within_workspace(temp_workspace)
+        assert not workspace_manager.is_within_workspace(temp_workspace + "-sibling")
+    
     def test_get_workspace_info(self, workspace_manager, temp_workspace):
         """Test getting workspace information."""
         info = workspace_manager.get_workspace_info()